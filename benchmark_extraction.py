@@ -0,0 +1,64 @@
+"""Compare per-article extraction latency: WebDriver element text vs in-process readability.
+
+Loads each URL once in Chrome, then times both extraction paths on the same
+rendered page using the analyzer's selectors.
+
+    python benchmark_extraction.py URL [URL ...] [--runs 5]
+"""
+import argparse
+import statistics
+import time
+from core.website_analyzer import WebsiteAnalyzer
+from core.content_extractor import ContentExtractor
+from utils.driver_manager import create_chrome
+
+def time_call(func, runs: int):
+    timings = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark article extraction paths")
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    driver = create_chrome()
+    analyzer = WebsiteAnalyzer(driver)
+    extractor = ContentExtractor(driver)
+    totals = {'webdriver': [], 'readability': []}
+
+    try:
+        for url in args.urls:
+            driver.get(url)
+            time.sleep(2)  # Wait for page load
+            selectors = analyzer.analyze_website_structure(url, page_source=driver.page_source)['selectors']
+
+            webdriver_ms, webdriver_content = time_call(
+                lambda: extractor.extract_content(selectors), args.runs
+            )
+            # The readability path pays for fetching the page source itself
+            readability_ms, readability_content = time_call(
+                lambda: extractor.extract_from_source(driver.page_source, selectors), args.runs
+            )
+            totals['webdriver'].append(webdriver_ms)
+            totals['readability'].append(readability_ms)
+
+            print(f"\n{url}")
+            for name, ms, content in [('webdriver', webdriver_ms, webdriver_content),
+                                      ('readability', readability_ms, readability_content)]:
+                length = len(content.get('content', '')) if content else 0
+                print(f"  {name:<12} {ms:8.1f} ms  {length:>7} chars")
+    finally:
+        driver.quit()
+
+    print("\nMedian per article:")
+    for name, timings in totals.items():
+        print(f"  {name:<12} {statistics.median(timings):8.1f} ms")
+
+if __name__ == "__main__":
+    main()
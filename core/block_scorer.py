@@ -0,0 +1,98 @@
+import json
+import os
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional
+import numpy as np
+
+FEATURE_NAMES = [
+    'log_text_length',
+    'log_paragraphs',
+    'log_images',
+    'log_lists',
+    'link_density',
+    'positive_hint',
+    'negative_hint',
+    'is_article_tag',
+    'text_share'
+]
+
+# Hand-set starting point, roughly matching the old threshold rules
+# (long text, paragraphs, content-like class names) until a model is trained
+DEFAULT_WEIGHTS = [1.2, 0.8, 0.1, 0.1, -4.0, 1.0, -2.0, 0.5, -1.0]
+DEFAULT_BIAS = -8.5
+
+class BlockScorer:
+    """Logistic model scoring every candidate content block in one matrix product"""
+
+    def __init__(self, weights: Optional[List[float]] = None, bias: float = DEFAULT_BIAS,
+                 mean: Optional[List[float]] = None, scale: Optional[List[float]] = None):
+        n = len(FEATURE_NAMES)
+        self.weights = np.asarray(weights if weights is not None else DEFAULT_WEIGHTS, dtype=np.float64)
+        self.bias = float(bias)
+        self.mean = np.asarray(mean if mean is not None else np.zeros(n), dtype=np.float64)
+        self.scale = np.asarray(scale if scale is not None else np.ones(n), dtype=np.float64)
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """Probability that each row is the main content block"""
+        if features.size == 0:
+            return np.zeros(0)
+        logits = ((features - self.mean) / self.scale) @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    @classmethod
+    def train(cls, features: np.ndarray, labels: np.ndarray, epochs: int = 2000,
+              learning_rate: float = 0.1, l2: float = 1e-3) -> 'BlockScorer':
+        """Fit a class-balanced, L2-regularized logistic regression by gradient descent"""
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0)
+        scale[scale == 0] = 1.0
+        X = (features - mean) / scale
+        y = labels.astype(np.float64)
+
+        # Few blocks per page are the article: weight positives up to balance
+        positives = max(y.sum(), 1.0)
+        negatives = max(len(y) - y.sum(), 1.0)
+        sample_weight = np.where(y == 1, len(y) / (2 * positives), len(y) / (2 * negatives))
+
+        weights = np.zeros(X.shape[1])
+        bias = 0.0
+        for _ in range(epochs):
+            predictions = 1.0 / (1.0 + np.exp(-(X @ weights + bias)))
+            error = (predictions - y) * sample_weight
+            weights -= learning_rate * (X.T @ error / len(y) + l2 * weights)
+            bias -= learning_rate * error.mean()
+
+        return cls(weights=weights.tolist(), bias=bias, mean=mean.tolist(), scale=scale.tolist())
+
+    def save(self, path: str = 'block_model.json'):
+        """Save model parameters to file"""
+        with open(path, 'w') as f:
+            json.dump({
+                'features': FEATURE_NAMES,
+                'weights': self.weights.tolist(),
+                'bias': self.bias,
+                'mean': self.mean.tolist(),
+                'scale': self.scale.tolist()
+            }, f, indent=4)
+
+    @classmethod
+    def load(cls, path: str = 'block_model.json') -> 'BlockScorer':
+        """Load a trained model, or the default weights if there is none"""
+        if not os.path.exists(path):
+            return cls()
+        return _load_model(path, os.path.getmtime(path))
+
+    def describe(self) -> Dict[str, float]:
+        return dict(zip(FEATURE_NAMES, self.weights.tolist()))
+
+@lru_cache(maxsize=4)
+def _load_model(path: str, mtime: float) -> BlockScorer:
+    # Keyed on mtime so a retrained model is picked up without restarting
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if data.get('features') != FEATURE_NAMES:
+        logging.getLogger(__name__).warning(f"{path} was trained on other features, using defaults")
+        return BlockScorer()
+    return BlockScorer(weights=data['weights'], bias=data['bias'],
+                       mean=data['mean'], scale=data['scale'])
@@ -0,0 +1,117 @@
+import hashlib
+import re
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from models.page_state import PageState
+from utils.crawl_state import CrawlStateStorage
+from utils.fetcher import fetch_url
+from utils.rate_limiter import RateLimiter
+
+# Markup that changes on every request without the article changing
+VOLATILE_MARKUP = re.compile(
+    r'<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->|<input[^>]*>|<meta[^>]*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+class ChangeDetector:
+    def __init__(self, storage: CrawlStateStorage,
+                 min_interval: float = 3600, max_interval: float = 30 * 86400,
+                 initial_interval: float = 86400, rate_limiter: Optional[RateLimiter] = None):
+        self.storage = storage
+        self.rate_limiter = rate_limiter
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        # Validators and body hash seen by should_scrape, saved once extraction succeeds
+        self._pending = {}
+        self.logger = logging.getLogger(__name__)
+
+    def should_scrape(self, url: str) -> bool:
+        """Check whether a URL needs a full analysis and extraction pass"""
+        state = self.storage.get_state(url)
+        if state is not None and not state.is_due():
+            self.logger.info(f"Not due for re-check until {state.next_check:%Y-%m-%d %H:%M}: {url}")
+            return False
+
+        # A first visit is fetched too, so its validators and body hash are
+        # known when the page is first re-checked
+        headers = {}
+        if state is not None and state.etag:
+            headers['If-None-Match'] = state.etag
+        if state is not None and state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+
+        try:
+            if self.rate_limiter:
+                response = self.rate_limiter.run(url, lambda: fetch_url(url, headers))
+            else:
+                response = fetch_url(url, headers)
+        except Exception as e:
+            self.logger.warning(f"Conditional request failed for {url}: {e}")
+            return True
+
+        if response.status == 304 and state is not None:
+            self.logger.info(f"Not modified (304): {url}")
+            state.reschedule(False, self.min_interval, self.max_interval)
+            self.storage.update_state(state)
+            return False
+
+        if response.status != 200:
+            return True
+
+        body_hash = self._hash_markup(response.text())
+        if state is not None and state.body_hash == body_hash:
+            self.logger.info(f"Unchanged content hash: {url}")
+            state.etag = response.headers.get('ETag')
+            state.last_modified = response.headers.get('Last-Modified')
+            state.reschedule(False, self.min_interval, self.max_interval)
+            self.storage.update_state(state)
+            return False
+
+        # Not saved yet: if the scrape fails, the next check must not see this as unchanged
+        self._pending[url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'), body_hash)
+        return True
+
+    def changed_since_last_check(self, url: str, lastmod: Optional[datetime]) -> bool:
+        """Use a sitemap/feed lastmod to rule out pages we already have"""
+        state = self.storage.get_state(url)
+        if state is None or lastmod is None:
+            return True
+        if lastmod.tzinfo is not None:
+            lastmod = lastmod.astimezone().replace(tzinfo=None)
+        return lastmod > state.last_checked
+
+    def record_scrape(self, url: str, content: Dict):
+        """Record an extracted page and adapt its re-check schedule"""
+        content_hash = self._hash_text(f"{content.get('title', '')}\n{content.get('content', '')}")
+        state = self.storage.get_state(url)
+
+        if state is None:
+            now = datetime.now()
+            state = PageState(
+                url=url,
+                etag=None,
+                last_modified=None,
+                body_hash=None,
+                content_hash=content_hash,
+                last_checked=now,
+                next_check=now + timedelta(seconds=self.initial_interval),
+                interval=self.initial_interval
+            )
+        else:
+            # A changed body can still carry the same article text (ads, counters)
+            state.reschedule(state.content_hash != content_hash,
+                             self.min_interval, self.max_interval)
+            state.content_hash = content_hash
+
+        if url in self._pending:
+            state.etag, state.last_modified, state.body_hash = self._pending.pop(url)
+        self.storage.update_state(state)
+
+    def _hash_markup(self, html: str) -> str:
+        """Hash page markup with volatile parts stripped"""
+        return self._hash_text(VOLATILE_MARKUP.sub('', html))
+
+    def _hash_text(self, text: str) -> str:
+        return hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()
@@ -1,13 +1,14 @@
-from bs4 import BeautifulSoup
 from typing import Dict, List, Optional
 import logging
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from core.readability import ReadabilityExtractor
 
 class ContentExtractor:
     def __init__(self, driver):
         self.driver = driver
+        self.readability = ReadabilityExtractor()
         self.logger = logging.getLogger(__name__)
 
     def extract_content(self, selectors: Dict[str, str]) -> Dict:
@@ -43,4 +44,12 @@ class ContentExtractor:
             
         except Exception as e:
             self.logger.error(f"Error extracting content: {e}")
-            return None 
\ No newline at end of file
+            return None 
+
+    def extract_from_source(self, page_source: str, selectors: Dict[str, str]) -> Optional[Dict]:
+        """Extract clean content and metadata from already fetched HTML, without the browser"""
+        try:
+            return self.readability.extract(page_source, selectors)
+        except Exception as e:
+            self.logger.error(f"Error extracting content from source: {e}")
+            return None
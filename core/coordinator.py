@@ -0,0 +1,262 @@
+import glob
+import json
+import os
+import time
+import logging
+import multiprocessing
+from functools import partial
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+from core.change_detector import ChangeDetector
+from core.crawl_queue import CrawlQueue, shard_for
+from core.page_processor import process_with_template, get_website, store_scrape_result, session_link
+from core.website_analyzer import WebsiteAnalyzer
+from utils.crawl_state import CrawlStateStorage
+from utils.driver_manager import DriverManager, create_chrome
+from utils.fetcher import fetch_url
+from utils.page_cache import PageCache
+from utils.rate_limiter import RateLimiter, CircuitOpenError
+from utils.storage import PatternStorage
+
+FETCH_MODES = ('http', 'browser')
+GONE_STATUSES = (404, 410)
+
+def shard_file(work_dir: str, name: str, shard, extension: str) -> str:
+    """Path of a per-shard file; shard may be '*' to glob them all"""
+    return os.path.join(work_dir, f"{name}-{shard}.{extension}")
+
+class ShardWorker:
+    """Crawl every URL of one shard.
+
+    The worker owns its shard's pattern, crawl-state and result files and its
+    own rate limiter, so no file or domain is ever shared with another process.
+    """
+
+    def __init__(self, shard: int, queue_path: str, work_dir: str,
+                 fetch_mode: str = 'http', incremental: bool = False, batch: int = 10):
+        self.shard = shard
+        self.batch = batch
+        self.fetch_mode = fetch_mode
+        self.incremental = incremental
+        self.logger = logging.getLogger(f"{__name__}.shard{shard}")
+        self.queue = CrawlQueue(queue_path)
+        self.rate_limiter = RateLimiter()
+        self.storage = PatternStorage(shard_file(work_dir, 'patterns', shard, 'json'))
+        self.change_detector = ChangeDetector(
+            CrawlStateStorage(shard_file(work_dir, 'crawl_state', shard, 'json')),
+            rate_limiter=self.rate_limiter
+        )
+        self.page_cache = PageCache()
+        self.driver = DriverManager(partial(create_chrome, headless=True)) if fetch_mode == 'browser' else None
+        self.analyzer = WebsiteAnalyzer(self.driver, self.page_cache)
+        self.results_path = shard_file(work_dir, 'results', shard, 'jsonl')
+        self.scraped = 0
+
+    def run(self):
+        """Drain the shard until nothing is pending or leased"""
+        try:
+            with open(self.results_path, 'a', encoding='utf-8') as results:
+                while True:
+                    urls = self.queue.lease(self.shard, self.batch)
+                    if not urls:
+                        if not self.queue.remaining(self.shard):
+                            break
+                        time.sleep(1)  # Only postponed or other leases left
+                        continue
+                    for url in urls:
+                        self._crawl(url, results)
+        finally:
+            if self.driver:
+                self.driver.quit()
+            self.queue.close()
+        self.logger.info(f"Shard {self.shard} finished: {self.scraped} pages scraped")
+
+    def _crawl(self, url: str, results):
+        try:
+            if self.incremental and not self.change_detector.should_scrape(url):
+                self.queue.complete(url)
+                return
+
+            page_source, status = self._fetch(url)
+            if page_source is None:
+                self.queue.fail(url, f"HTTP {status}", retry=status not in GONE_STATUSES)
+                return
+
+            content = self._scrape(url, page_source)
+            if content:
+                results.write(json.dumps(session_link(url, content), ensure_ascii=False) + '\n')
+                results.flush()
+                self.scraped += 1
+            self.queue.complete(url)
+        except CircuitOpenError as e:
+            self.logger.warning(f"Postponing {url}: {e}")
+            self.queue.postpone(url, self.rate_limiter.cooldown)
+        except Exception as e:
+            self.logger.error(f"Error scraping {url}: {e}")
+            self.queue.fail(url, str(e))
+
+    def _fetch(self, url: str) -> Tuple[Optional[str], int]:
+        """Return the page source (None on an error status) and the HTTP status"""
+        if self.driver:
+            page = self.rate_limiter.run(url, lambda: self.driver.load(url))
+            if page.status >= 400:
+                self.logger.warning(f"Got HTTP {page.status} for {url}")
+                return None, page.status
+            time.sleep(2)  # Wait for page load
+            return self.analyzer.capture_page_source(url), page.status
+
+        response = self.rate_limiter.run(url, lambda: fetch_url(url))
+        if response.status != 200:
+            self.logger.warning(f"Got HTTP {response.status} for {url}")
+            return None, response.status
+        page_source = response.text()
+        self.page_cache.store(url, page_source, response.headers)
+        return page_source, response.status
+
+    def _scrape(self, url: str, page_source: str) -> Optional[Dict]:
+        """Extract a page and update the shard's templates, patterns and crawl state"""
+        website = get_website(self.storage, url)
+        result, template_ok = process_with_template(url, page_source, self.analyzer.match_template(website, url))
+        return store_scrape_result(self.analyzer, self.storage, self.change_detector,
+                                   website, url, result, template_ok)
+
+def run_worker(shard: int, queue_path: str, work_dir: str, fetch_mode: str, incremental: bool):
+    """Worker process entry point"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    ShardWorker(shard, queue_path, work_dir, fetch_mode, incremental).run()
+
+class CrawlCoordinator:
+    """Run one worker process per queue shard and merge their output.
+
+    Workers write only their own shard files. The shared session, pattern and
+    crawl-state files are written by the coordinator alone, once, after the
+    workers exit.
+    """
+
+    def __init__(self, queue_path: str = 'crawl_queue.db', work_dir: str = 'crawl_shards',
+                 data_file: str = 'scraping_data.json', patterns_file: str = 'website_patterns.json',
+                 state_file: str = 'crawl_state.json', fetch_mode: str = 'http',
+                 incremental: bool = False, max_restarts: int = 3):
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unsupported fetch mode: {fetch_mode}")
+        self.queue_path = queue_path
+        self.work_dir = work_dir
+        self.data_file = data_file
+        self.patterns_file = patterns_file
+        self.state_file = state_file
+        self.fetch_mode = fetch_mode
+        self.incremental = incremental
+        self.max_restarts = max_restarts
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, progress_interval: float = 10) -> Optional[str]:
+        """Crawl the queue to completion, returning the new session id (if anything was scraped)"""
+        os.makedirs(self.work_dir, exist_ok=True)
+        queue = CrawlQueue(self.queue_path)
+        try:
+            # Output left behind by an interrupted run is merged before reseeding
+            self.merge()
+            self.seed_shards(queue.shards)
+
+            processes = {shard: self._start_worker(shard) for shard in range(queue.shards)
+                         if queue.remaining(shard)}
+            restarts = {shard: 0 for shard in processes}
+            while processes:
+                time.sleep(progress_interval)
+                for shard, process in list(processes.items()):
+                    if process.is_alive():
+                        continue
+                    process.join()
+                    del processes[shard]
+                    if process.exitcode and queue.remaining(shard) and restarts[shard] < self.max_restarts:
+                        self.logger.warning(f"Worker for shard {shard} exited with {process.exitcode}, restarting")
+                        restarts[shard] += 1
+                        processes[shard] = self._start_worker(shard)
+                counts = queue.counts()
+                print(f"\rDone {counts.get('done', 0)}, remaining {queue.remaining()}, "
+                      f"failed {counts.get('failed', 0)}, workers {len(processes)}", end='')
+            print()
+        finally:
+            queue.close()
+        return self.merge()
+
+    def seed_shards(self, shards: int):
+        """Give each shard the known patterns and crawl state of its own domains"""
+        patterns = PatternStorage(self.patterns_file).patterns
+        states = CrawlStateStorage(self.state_file).states
+        for shard in range(shards):
+            shard_patterns = PatternStorage(shard_file(self.work_dir, 'patterns', shard, 'json'))
+            shard_patterns.patterns = {domain: website for domain, website in patterns.items()
+                                       if shard_for(domain, shards) == shard}
+            shard_patterns.save_patterns()
+
+            shard_states = CrawlStateStorage(shard_file(self.work_dir, 'crawl_state', shard, 'json'))
+            shard_states.states = {url: state for url, state in states.items()
+                                   if shard_for(urlparse(url).netloc, shards) == shard}
+            shard_states.save_states()
+
+    def merge(self) -> Optional[str]:
+        """Fold shard files back into the shared stores and remove them"""
+        pattern_files = glob.glob(shard_file(self.work_dir, 'patterns', '*', 'json'))
+        if pattern_files:
+            storage = PatternStorage(self.patterns_file)
+            for path in pattern_files:
+                storage.patterns.update(PatternStorage(path).patterns)
+            storage.save_patterns()
+
+        state_files = glob.glob(shard_file(self.work_dir, 'crawl_state', '*', 'json'))
+        if state_files:
+            state_storage = CrawlStateStorage(self.state_file)
+            for path in state_files:
+                state_storage.states.update(CrawlStateStorage(path).states)
+            state_storage.save_states()
+
+        session_id = self._merge_results(sorted(glob.glob(shard_file(self.work_dir, 'results', '*', 'jsonl'))))
+        for path in pattern_files + state_files:
+            os.remove(path)
+        return session_id
+
+    def _merge_results(self, result_files) -> Optional[str]:
+        links = []
+        for path in result_files:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        links.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A worker killed mid-write leaves a truncated last line
+                        self.logger.warning(f"Skipping truncated result in {path}")
+
+        session_id = None
+        if links:
+            session_data = {"sessions": {}}
+            if os.path.exists(self.data_file):
+                with open(self.data_file, 'r') as f:
+                    session_data = json.load(f)
+            session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            while session_id in session_data["sessions"]:
+                session_id += '_1'
+            session_data["sessions"][session_id] = {
+                "date": datetime.now().strftime('%Y-%m-%d'),
+                "links": links
+            }
+            with open(self.data_file, 'w') as f:
+                json.dump(session_data, f, indent=4)
+            self.logger.info(f"Merged {len(links)} pages into session {session_id}")
+
+        for path in result_files:
+            os.remove(path)
+        return session_id
+
+    def _start_worker(self, shard: int) -> multiprocessing.Process:
+        process = multiprocessing.Process(
+            target=run_worker,
+            args=(shard, self.queue_path, self.work_dir, self.fetch_mode, self.incremental),
+            name=f"crawl-shard-{shard}"
+        )
+        process.start()
+        return process
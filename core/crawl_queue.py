@@ -0,0 +1,156 @@
+import sqlite3
+import time
+import zlib
+import logging
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    domain TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    leased_until REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS urls_shard_status ON urls (shard, status, leased_until);
+"""
+
+def shard_for(domain: str, shards: int) -> int:
+    """Stable shard of a domain, the same in every process and run"""
+    domain = domain.lower()
+    domain = domain[4:] if domain.startswith('www.') else domain
+    return zlib.crc32(domain.encode('utf-8')) % shards
+
+class CrawlQueue:
+    """Durable URL queue in SQLite, partitioned into shards by domain hash.
+
+    Every URL of a domain lands in the same shard, and each shard is drained by
+    exactly one worker. A leased URL that is not completed in time (the worker
+    died) becomes available again.
+    """
+
+    def __init__(self, db_path: str = 'crawl_queue.db', shards: Optional[int] = None,
+                 lease_seconds: float = 300, max_attempts: int = 3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger(__name__)
+        # One connection per process: never share it across a fork
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.shards = self._shard_count(shards)
+
+    def _shard_count(self, shards: Optional[int]) -> int:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'shards'").fetchone()
+        if row:
+            stored = int(row[0])
+            if shards and shards != stored:
+                # Reassigning shards would split domains across workers
+                raise ValueError(f"Queue {self.db_path} is sharded {stored} ways, not {shards}")
+            return stored
+        shards = shards or 1
+        self.conn.execute("INSERT INTO meta (key, value) VALUES ('shards', ?)", (str(shards),))
+        return shards
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """Add URLs that are not queued yet, returning how many were new"""
+        now = time.time()
+        rows = []
+        for url in urls:
+            domain = urlparse(url).netloc.lower()
+            if domain:
+                rows.append((url, domain, shard_for(domain, self.shards), now))
+
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO urls (url, domain, shard, updated) VALUES (?, ?, ?, ?)", rows
+            )
+            return self.conn.total_changes - before
+
+    def lease(self, shard: int, batch: int = 10) -> List[str]:
+        """Claim up to `batch` pending (or abandoned) URLs of a shard"""
+        now = time.time()
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            # A URL whose worker keeps dying (e.g. it crashes the browser) must not loop forever
+            self.conn.execute(
+                "UPDATE urls SET status = 'failed', updated = ?, "
+                "error = CASE WHEN status = 'leased' THEN 'Lease expired' ELSE error END "
+                "WHERE shard = ? AND (status = 'pending' OR (status = 'leased' AND leased_until < ?)) "
+                "AND attempts >= ?",
+                (now, shard, now, self.max_attempts)
+            )
+            urls = [row[0] for row in self.conn.execute(
+                "SELECT url FROM urls WHERE shard = ? AND (status = 'pending' "
+                "OR (status = 'leased' AND leased_until < ?)) AND attempts < ? LIMIT ?",
+                (shard, now, self.max_attempts, batch)
+            )]
+            self.conn.executemany(
+                "UPDATE urls SET status = 'leased', attempts = attempts + 1, "
+                "leased_until = ?, updated = ? WHERE url = ?",
+                [(now + self.lease_seconds, now, url) for url in urls]
+            )
+        return urls
+
+    def complete(self, url: str):
+        with self.conn:
+            self.conn.execute("UPDATE urls SET status = 'done', error = NULL, updated = ? WHERE url = ?",
+                              (time.time(), url))
+
+    def fail(self, url: str, error: str, retry: bool = True):
+        """Return a URL to the queue, or give up on it after max_attempts (or at once)"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE urls SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, updated = ? WHERE url = ?",
+                (self.max_attempts if retry else 0, error[:500], time.time(), url)
+            )
+
+    def postpone(self, url: str, seconds: float):
+        """Hold a leased URL back for a while without using up an attempt"""
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE urls SET attempts = attempts - 1, leased_until = ?, updated = ? WHERE url = ?",
+                (now + seconds, now, url)
+            )
+
+    def remaining(self, shard: Optional[int] = None) -> int:
+        """URLs still pending or leased, in one shard or overall"""
+        query = "SELECT COUNT(*) FROM urls WHERE status IN ('pending', 'leased')"
+        params = ()
+        if shard is not None:
+            query += " AND shard = ?"
+            params = (shard,)
+        return self.conn.execute(query, params).fetchone()[0]
+
+    def retry_failed(self) -> int:
+        """Put permanently failed URLs back in the queue"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE urls SET status = 'pending', attempts = 0, updated = ? WHERE status = 'failed'",
+                (time.time(),)
+            )
+            return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status").fetchall())
+
+    def shard_counts(self) -> Dict[int, Dict[str, int]]:
+        counts = {}
+        for shard, status, count in self.conn.execute(
+                "SELECT shard, status, COUNT(*) FROM urls GROUP BY shard, status"):
+            counts.setdefault(shard, {})[status] = count
+        return counts
+
+    def close(self):
+        self.conn.close()
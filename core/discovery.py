@@ -0,0 +1,198 @@
+import logging
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
+from bs4 import BeautifulSoup
+from dateutil import parser as date_parser
+from utils.fetcher import fetch_url, open_url
+from utils.rate_limiter import RateLimiter
+
+FEED_TYPES = ('application/rss+xml', 'application/atom+xml')
+DEFAULT_SITEMAPS = ('/sitemap.xml', '/sitemap_index.xml')
+
+def site_of(url: str) -> str:
+    """Host of a URL, lowercased and without a leading www."""
+    netloc = urlparse(url).netloc.lower()
+    return netloc[4:] if netloc.startswith('www.') else netloc
+
+@dataclass
+class DiscoveredUrl:
+    url: str
+    lastmod: Optional[datetime]
+    source: str
+
+class ArticleDiscovery:
+    """Enumerate article URLs from feeds and sitemaps, without rendering any page"""
+
+    def __init__(self, max_sitemaps: int = 100, timeout: float = 15,
+                 rate_limiter: Optional[RateLimiter] = None):
+        self.max_sitemaps = max_sitemaps
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.logger = logging.getLogger(__name__)
+
+    def discover(self, home_url: str) -> Iterator[DiscoveredUrl]:
+        """Yield the site's article URLs, freshest sources (feeds) first, then sitemaps.
+
+        Feeds and sitemaps may list pages of other hosts (syndicated stories,
+        sister sites); only URLs on the home page's host are yielded.
+        """
+        site = site_of(home_url)
+        seen = set()
+        for feed_url in self.feeds_from_home(home_url):
+            for item in self._safe_parse(self.parse_feed, feed_url):
+                if item.url not in seen and site_of(item.url) == site:
+                    seen.add(item.url)
+                    yield item
+
+        sitemaps = self.sitemaps_from_robots(home_url) or [urljoin(home_url, path) for path in DEFAULT_SITEMAPS]
+        visited = set()
+        for sitemap_url in sitemaps:
+            for item in self._walk_sitemap(sitemap_url, visited):
+                if item.url not in seen and site_of(item.url) == site:
+                    seen.add(item.url)
+                    yield item
+
+    def sitemaps_from_robots(self, home_url: str) -> List[str]:
+        """Read Sitemap: entries from robots.txt"""
+        try:
+            response = self._request(urljoin(home_url, '/robots.txt'), fetch_url)
+        except Exception as e:
+            self.logger.warning(f"Could not read robots.txt: {e}")
+            return []
+        if response.status != 200:
+            return []
+
+        sitemaps = []
+        for line in response.text().splitlines():
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'sitemap' and value.strip():
+                sitemaps.append(value.strip())
+        return sitemaps
+
+    def feeds_from_home(self, home_url: str) -> List[str]:
+        """Find RSS/Atom feeds advertised in the home page head"""
+        try:
+            response = self._request(home_url, fetch_url)
+        except Exception as e:
+            self.logger.warning(f"Could not read home page: {e}")
+            return []
+        if response.status != 200:
+            return []
+
+        soup = BeautifulSoup(response.text(), 'html.parser')
+        feeds = []
+        for link in soup.find_all('link', href=True):
+            rel = [r.lower() for r in (link.get('rel') or [])]
+            if 'alternate' in rel and link.get('type', '').lower() in FEED_TYPES:
+                feeds.append(urljoin(home_url, link['href']))
+        return feeds
+
+    def parse_sitemap(self, sitemap_url: str) -> Tuple[List[Tuple[str, Optional[datetime]]], Iterator[DiscoveredUrl]]:
+        """Stream a sitemap or sitemap index.
+
+        Returns child sitemaps (for an index) and an iterator over page URLs,
+        newest lastmod first. Only the small (url, lastmod) entries of one leaf
+        sitemap are buffered; parsed elements are dropped as they are read.
+        """
+        children = []
+
+        def pages():
+            entries = []
+            with self._request(sitemap_url, open_url) as stream:
+                for element, fields in self._iter_entries(stream, ('url', 'sitemap')):
+                    loc = fields.get('loc')
+                    if not loc:
+                        continue
+                    lastmod = self._parse_date(fields.get('lastmod') or fields.get('publication_date'))
+                    if element == 'sitemap':
+                        children.append((loc, lastmod))
+                    else:
+                        entries.append(DiscoveredUrl(url=loc, lastmod=lastmod, source=sitemap_url))
+
+            # Many sitemaps list the oldest articles first
+            entries.sort(key=lambda entry: self._sort_key(entry.lastmod), reverse=True)
+            yield from entries
+
+        return children, pages()
+
+    def parse_feed(self, feed_url: str) -> Iterator[DiscoveredUrl]:
+        """Stream entries from an RSS or Atom feed"""
+        with self._request(feed_url, open_url) as stream:
+            for _, fields in self._iter_entries(stream, ('item', 'entry')):
+                link = fields.get('link')
+                if not link:
+                    continue
+                date = fields.get('updated') or fields.get('published') or fields.get('pubDate') or fields.get('date')
+                yield DiscoveredUrl(url=urljoin(feed_url, link), lastmod=self._parse_date(date), source=feed_url)
+
+    def _request(self, url: str, opener):
+        if self.rate_limiter:
+            return self.rate_limiter.run(url, lambda: opener(url, timeout=self.timeout))
+        return opener(url, timeout=self.timeout)
+
+    def _walk_sitemap(self, sitemap_url: str, visited: Set[str]) -> Iterator[DiscoveredUrl]:
+        if sitemap_url in visited or len(visited) >= self.max_sitemaps:
+            return
+        visited.add(sitemap_url)
+
+        try:
+            children, pages = self.parse_sitemap(sitemap_url)
+            yield from pages
+        except Exception as e:
+            self.logger.warning(f"Could not read sitemap {sitemap_url}: {e}")
+            return
+
+        # Newest child sitemaps first, they hold the recent articles
+        children.sort(key=lambda child: self._sort_key(child[1]), reverse=True)
+        for child_url, _ in children:
+            yield from self._walk_sitemap(child_url, visited)
+
+    def _safe_parse(self, parse, url: str) -> Iterator[DiscoveredUrl]:
+        try:
+            yield from parse(url)
+        except Exception as e:
+            self.logger.warning(f"Could not read {url}: {e}")
+
+    def _iter_entries(self, stream, entry_names: Tuple[str, ...]):
+        """Incrementally parse XML, yielding (entry name, {child name: text}) per entry"""
+        fields = None
+        # Open ancestors, so finished entries can be detached from the tree
+        parents = []
+        for event, element in ET.iterparse(stream, events=('start', 'end')):
+            name = element.tag.rsplit('}', 1)[-1]
+            if event == 'start':
+                parents.append(element)
+                if name in entry_names:
+                    fields = {}
+                continue
+
+            parents.pop()
+            if name in entry_names:
+                if fields is not None:
+                    yield name, fields
+                fields = None
+                if parents:
+                    parents[-1].remove(element)
+                element.clear()
+            elif fields is not None:
+                if name == 'link' and element.get('href'):
+                    # Atom: prefer rel="alternate" (the default) over other links
+                    if element.get('rel', 'alternate') == 'alternate':
+                        fields.setdefault('link', element.get('href'))
+                elif element.text and element.text.strip():
+                    fields.setdefault(name, element.text.strip())
+
+    def _sort_key(self, date: Optional[datetime]) -> float:
+        """Newest-first sort key; undated entries go last"""
+        return date.timestamp() if date else 0
+
+    def _parse_date(self, value: Optional[str]) -> Optional[datetime]:
+        if not value:
+            return None
+        try:
+            return date_parser.parse(value)
+        except (ValueError, OverflowError):
+            return None
@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+from core.website_analyzer import WebsiteAnalyzer
+from core.content_extractor import ContentExtractor
+from models.website import Website
+
+def process_page(url: str, page_source: str, selectors: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+    """Analyze and extract a page from its HTML alone.
+
+    Module-level so it can run in worker processes: no driver, no shared state.
+    """
+    if selectors is None:
+        analysis = WebsiteAnalyzer(None).analyze_website_structure(url, page_source=page_source)
+        if not analysis or 'selectors' not in analysis:
+            return None
+        selectors = analysis['selectors']
+
+    content = ContentExtractor(None).extract_from_source(page_source, selectors)
+    if not content:
+        return None
+
+    return {
+        'selectors': selectors,
+        'content': content
+    }
+
+def process_with_template(url: str, page_source: str,
+                          template_selectors: Optional[Dict[str, str]] = None) -> Tuple[Optional[Dict], Optional[bool]]:
+    """Try a learned extractor first, falling back to full analysis.
+
+    Returns the result and whether the template worked. That is None when there
+    was no template, or when full analysis failed too: a page nothing can
+    extract (an archive or contact page matching the template) says nothing
+    about the extractor.
+    """
+    template_ok = None
+    result = None
+    if template_selectors:
+        result = process_page(url, page_source, template_selectors)
+        template_ok = bool(result)
+
+    if not result:
+        result = process_page(url, page_source)
+        if not result:
+            template_ok = None
+
+    return result, template_ok
+
+def get_website(storage, url: str) -> Website:
+    """The stored patterns of a URL's domain, or an empty Website to learn into"""
+    domain = urlparse(url).netloc
+    return storage.get_patterns(domain) or Website(
+        url=url,
+        domain=domain,
+        patterns={},
+        last_updated=datetime.now()
+    )
+
+def store_scrape_result(analyzer: WebsiteAnalyzer, storage, change_detector, website: Website, url: str,
+                        result: Optional[Dict], template_ok: Optional[bool]) -> Optional[Dict]:
+    """Apply a process_with_template result to the template, pattern and crawl state.
+
+    Returns the extracted content, or None when nothing could be extracted.
+    """
+    if template_ok is not None:
+        analyzer.record_template_result(website, url, template_ok)
+
+    if not result:
+        storage.update_patterns(website)
+        return None
+
+    if not template_ok:
+        analyzer.learn_from_successful_scrape(website, url, result['selectors'])
+    for pattern_type, selector in result['selectors'].items():
+        website.update_pattern_success(pattern_type, selector)
+    storage.update_patterns(website)
+
+    change_detector.record_scrape(url, result['content'])
+    return result['content']
+
+def session_link(url: str, content: Dict) -> Dict:
+    """A scraped page as a session link entry"""
+    return {
+        "url": url,
+        "title": content.get('title', ''),
+        "content": content.get('content', ''),
+        "date": content.get('date', ''),
+        "author": content.get('author', ''),
+        "metadata": content.get('metadata', {}),
+        "scraped_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
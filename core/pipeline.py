@@ -0,0 +1,161 @@
+import os
+import time
+import queue
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from core.page_processor import process_with_template
+
+_DONE = object()
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int
+    items: int = 0
+    busy: float = 0.0
+
+    def record(self, seconds: float):
+        self.items += 1
+        self.busy += seconds
+
+    def summary(self, elapsed: float) -> str:
+        rate = self.items / elapsed if elapsed else 0.0
+        utilization = self.busy / (elapsed * self.workers) if elapsed else 0.0
+        return (f"{self.name:<8} {self.items:>5} items  {rate:6.2f}/s  "
+                f"busy {self.busy:7.1f}s  utilization {utilization:4.0%}")
+
+def _timed_process(url: str, page_source: str, template_selectors: Optional[Dict[str, str]]) -> Tuple:
+    """Process-pool entry point: parse, analyze and extract one page"""
+    start = time.perf_counter()
+    result, template_ok = process_with_template(url, page_source, template_selectors)
+    return result, template_ok, time.perf_counter() - start
+
+class ScrapePipeline:
+    """Fetch -> parse/analyze -> persist, with bounded queues between stages.
+
+    Fetching is I/O bound and runs on threads; parsing and scoring hold the GIL,
+    so they run in a process pool. Every queue is bounded, so a slow stage
+    blocks the ones before it instead of letting pages pile up in memory.
+    """
+
+    def __init__(self, fetch: Callable[[str], Optional[str]],
+                 persist: Callable[[str, Optional[Dict], Optional[bool]], None],
+                 template_for: Callable[[str], Optional[Dict[str, str]]] = lambda url: None,
+                 fetch_workers: int = 1, process_workers: Optional[int] = None,
+                 queue_size: int = 8):
+        self.fetch = fetch
+        self.persist = persist
+        self.template_for = template_for
+        self.fetch_workers = fetch_workers
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.logger = logging.getLogger(__name__)
+        self.stats = {}
+
+    def run(self, urls: Iterable[str]) -> Dict[str, StageStats]:
+        """Push URLs through every stage and return per-stage statistics"""
+        self.stats = {
+            'fetch': StageStats('fetch', self.fetch_workers),
+            'process': StageStats('process', self.process_workers),
+            'persist': StageStats('persist', 1)
+        }
+        url_queue = queue.Queue(maxsize=self.queue_size)
+        page_queue = queue.Queue(maxsize=self.queue_size)
+        result_queue = queue.Queue()
+        # Pages handed to the pool but not yet persisted
+        in_flight = threading.BoundedSemaphore(self.process_workers * 2)
+        start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.process_workers) as executor:
+            threads = [threading.Thread(target=self._feed, args=(urls, url_queue), daemon=True)]
+            threads += [
+                threading.Thread(target=self._fetch_worker, args=(url_queue, page_queue), daemon=True)
+                for _ in range(self.fetch_workers)
+            ]
+            threads.append(threading.Thread(
+                target=self._dispatch, args=(executor, page_queue, result_queue, in_flight), daemon=True
+            ))
+            for thread in threads:
+                thread.start()
+
+            self._persist_results(result_queue, in_flight)
+
+            for thread in threads:
+                thread.join()
+
+        elapsed = time.perf_counter() - start
+        self.logger.info(f"Pipeline finished in {elapsed:.1f}s")
+        for stage in self.stats.values():
+            self.logger.info(stage.summary(elapsed))
+        return self.stats
+
+    def _feed(self, urls: Iterable[str], url_queue: queue.Queue):
+        try:
+            for url in urls:
+                url_queue.put(url)
+        finally:
+            for _ in range(self.fetch_workers):
+                url_queue.put(_DONE)
+
+    def _fetch_worker(self, url_queue: queue.Queue, page_queue: queue.Queue):
+        while True:
+            url = url_queue.get()
+            if url is _DONE:
+                page_queue.put(_DONE)
+                return
+            start = time.perf_counter()
+            try:
+                page_source = self.fetch(url)
+            except Exception as e:
+                self.logger.error(f"Error fetching {url}: {e}")
+                page_source = None
+            self.stats['fetch'].record(time.perf_counter() - start)
+            if page_source:
+                page_queue.put((url, page_source))
+
+    def _dispatch(self, executor: ProcessPoolExecutor, page_queue: queue.Queue,
+                  result_queue: queue.Queue, in_flight: threading.BoundedSemaphore):
+        finished_fetchers = 0
+        while finished_fetchers < self.fetch_workers:
+            item = page_queue.get()
+            if item is _DONE:
+                finished_fetchers += 1
+                continue
+
+            url, page_source = item
+            in_flight.acquire()
+            try:
+                future = executor.submit(_timed_process, url, page_source, self.template_for(url))
+            except Exception as e:
+                self.logger.error(f"Error submitting {url}: {e}")
+                in_flight.release()
+                continue
+            future.add_done_callback(lambda f, url=url: result_queue.put((url, f)))
+
+        # Wait for everything submitted to come back before signalling the end
+        for _ in range(self.process_workers * 2):
+            in_flight.acquire()
+        for _ in range(self.process_workers * 2):
+            in_flight.release()
+        result_queue.put(_DONE)
+
+    def _persist_results(self, result_queue: queue.Queue, in_flight: threading.BoundedSemaphore):
+        while True:
+            item = result_queue.get()
+            if item is _DONE:
+                return
+
+            url, future = item
+            try:
+                result, template_ok, seconds = future.result()
+                self.stats['process'].record(seconds)
+                start = time.perf_counter()
+                self.persist(url, result, template_ok)
+                self.stats['persist'].record(time.perf_counter() - start)
+            except Exception as e:
+                self.logger.error(f"Error processing {url}: {e}")
+            finally:
+                in_flight.release()
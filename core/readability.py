@@ -0,0 +1,267 @@
+import json
+import re
+import logging
+from typing import Dict, List, Optional
+from bs4 import BeautifulSoup, Tag
+
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'nav', 'aside', 'footer',
+                    'iframe', 'svg', 'button', 'select', 'template']
+# Forms are search boxes and comment forms, unless they wrap the page (ASP.NET WebForms)
+MIN_FORM_PARAGRAPH_TEXT = 200
+UNLIKELY = re.compile(r'comment|sidebar|footer|nav|menu|masthead|promo|sponsor|advert|\bads?\b|'
+                      r'banner|popup|modal|cookie|share|social|related|recommend|newsletter|subscribe',
+                      re.IGNORECASE)
+LIKELY = re.compile(r'article|body|content|entry|main|post|story|text|blog', re.IGNORECASE)
+POSITIVE = re.compile(r'article|body|content|entry|main|page|post|text|blog|story', re.IGNORECASE)
+NEGATIVE = re.compile(r'comment|com-|contact|footer|footnote|masthead|meta|outbrain|promo|related|'
+                      r'scroll|share|shoutbox|sidebar|skyscraper|sponsor|shopping|tags|widget|advert',
+                      re.IGNORECASE)
+PARAGRAPH_TAGS = ['p', 'pre', 'td', 'blockquote', 'li']
+TEXT_BLOCK_TAGS = ['p', 'pre', 'blockquote', 'li', 'h2', 'h3', 'h4', 'h5', 'h6', 'td', 'figcaption']
+ARTICLE_TYPES = {'Article', 'NewsArticle', 'BlogPosting', 'Report', 'ReportageNewsArticle',
+                 'AnalysisNewsArticle', 'OpinionNewsArticle', 'TechArticle', 'WebPage'}
+
+class ReadabilityExtractor:
+    """Boilerplate-free article text and metadata from raw HTML, in a single parse"""
+
+    def __init__(self, min_paragraph_length: int = 25):
+        self.min_paragraph_length = min_paragraph_length
+        self.logger = logging.getLogger(__name__)
+
+    def extract(self, html: str, selectors: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """Extract title, clean text and metadata.
+
+        A known article selector pins the container; otherwise the container
+        is chosen by paragraph-density scoring.
+        """
+        selectors = selectors or {}
+        soup = BeautifulSoup(html, 'html.parser')
+        metadata = self.extract_metadata(soup)
+
+        title = None
+        if selectors.get('title'):
+            title_elem = soup.select_one(selectors['title'])
+            if title_elem:
+                title = title_elem.get_text(' ', strip=True)
+        title = title or metadata.get('title') or self._fallback_title(soup)
+
+        date = None
+        if selectors.get('date'):
+            date_elem = soup.select_one(selectors['date'])
+            if date_elem:
+                date = date_elem.get('datetime') or date_elem.get_text(strip=True)
+        date = date or metadata.get('published')
+
+        if selectors.get('article'):
+            article = soup.select_one(selectors['article'])
+            if not article:
+                return None
+            self._remove_boilerplate(article)
+            blocks = [article]
+        else:
+            self._remove_boilerplate(soup)
+            blocks = self._best_blocks(soup)
+            if not blocks:
+                return None
+
+        text = self._blocks_to_text(blocks)
+        if not text:
+            return None
+
+        return {
+            'title': title or '',
+            'content': text,
+            'date': date or '',
+            'author': ', '.join(metadata.get('authors', [])),
+            'metadata': metadata
+        }
+
+    def extract_metadata(self, soup: BeautifulSoup) -> Dict:
+        """Collect OpenGraph/meta tags and JSON-LD article data"""
+        metadata = {}
+        meta = {}
+        for tag in soup.find_all('meta'):
+            key = (tag.get('property') or tag.get('name') or tag.get('itemprop') or '').lower()
+            if key and tag.get('content') and key not in meta:
+                meta[key] = tag['content'].strip()
+
+        for key, field in [('og:title', 'title'), ('og:description', 'description'),
+                           ('og:image', 'image'), ('og:site_name', 'site_name'),
+                           ('og:url', 'canonical_url'), ('og:type', 'type'),
+                           ('description', 'description'),
+                           ('article:published_time', 'published'),
+                           ('article:modified_time', 'modified'),
+                           ('datepublished', 'published'),
+                           ('article:section', 'section')]:
+            if key in meta and field not in metadata:
+                metadata[field] = meta[key]
+
+        authors = []
+        for key in ('author', 'article:author', 'parsely-author', 'sailthru.author'):
+            if key in meta and not meta[key].startswith('http'):
+                authors.append(meta[key])
+
+        for article in self._json_ld_articles(soup):
+            metadata.setdefault('title', article.get('headline') or article.get('name'))
+            metadata.setdefault('published', article.get('datePublished'))
+            metadata.setdefault('modified', article.get('dateModified'))
+            metadata.setdefault('description', article.get('description'))
+            authors.extend(self._names(article.get('author')))
+            publisher = self._names(article.get('publisher'))
+            if publisher:
+                metadata.setdefault('publisher', publisher[0])
+
+        if 'published' not in metadata or not metadata['published']:
+            time_elem = soup.find('time', datetime=True)
+            if time_elem:
+                metadata['published'] = time_elem['datetime']
+
+        metadata = {k: v for k, v in metadata.items() if v}
+        if authors:
+            metadata['authors'] = list(dict.fromkeys(a.strip() for a in authors if a.strip()))
+        return metadata
+
+    def _json_ld_articles(self, soup: BeautifulSoup) -> List[Dict]:
+        articles = []
+        for script in soup.find_all('script', type='application/ld+json'):
+            try:
+                data = json.loads(script.string or '')
+            except (json.JSONDecodeError, TypeError):
+                continue
+            stack = data if isinstance(data, list) else [data]
+            while stack:
+                item = stack.pop(0)
+                if not isinstance(item, dict):
+                    continue
+                stack.extend(item.get('@graph', []))
+                types = item.get('@type', [])
+                types = types if isinstance(types, list) else [types]
+                if ARTICLE_TYPES.intersection(types):
+                    articles.append(item)
+        # Prefer real article types over a generic WebPage
+        articles.sort(key=lambda item: 'WebPage' in str(item.get('@type')))
+        return articles
+
+    def _names(self, value) -> List[str]:
+        if not value:
+            return []
+        if isinstance(value, str):
+            return [value]
+        if isinstance(value, dict):
+            return [value['name']] if isinstance(value.get('name'), str) else []
+        if isinstance(value, list):
+            return [name for item in value for name in self._names(item)]
+        return []
+
+    def _fallback_title(self, soup: BeautifulSoup) -> Optional[str]:
+        h1 = soup.find('h1')
+        if h1 and h1.get_text(strip=True):
+            return h1.get_text(' ', strip=True)
+        if soup.title and soup.title.string:
+            return soup.title.string.strip()
+        return None
+
+    def _remove_boilerplate(self, root: Tag):
+        for tag in root.find_all(BOILERPLATE_TAGS):
+            tag.decompose()
+        for form in root.find_all('form'):
+            if not form.decomposed and self._paragraph_text_length(form) < MIN_FORM_PARAGRAPH_TEXT:
+                form.decompose()
+        for tag in root.find_all(['div', 'section', 'ul', 'header', 'span']):
+            if tag.decomposed:
+                continue
+            hints = ' '.join([tag.get('id') or ''] + (tag.get('class') or []))
+            if hints and UNLIKELY.search(hints) and not LIKELY.search(hints):
+                tag.decompose()
+
+    def _paragraph_text_length(self, tag: Tag) -> int:
+        return sum(len(p.get_text(strip=True)) for p in tag.find_all(PARAGRAPH_TAGS)
+                   if len(p.get_text(strip=True)) >= self.min_paragraph_length)
+
+    def _class_weight(self, tag: Tag) -> int:
+        weight = 0
+        for hints in (' '.join(tag.get('class') or []), tag.get('id') or ''):
+            if hints:
+                if NEGATIVE.search(hints):
+                    weight -= 25
+                if POSITIVE.search(hints):
+                    weight += 25
+        return weight
+
+    def _link_density(self, tag: Tag) -> float:
+        text_length = len(tag.get_text(strip=True))
+        if not text_length:
+            return 0.0
+        link_length = sum(len(a.get_text(strip=True)) for a in tag.find_all('a'))
+        return link_length / text_length
+
+    def _best_blocks(self, soup: BeautifulSoup) -> List[Tag]:
+        """Score containers by the paragraphs they hold and pick the article"""
+        scores = {}
+        nodes = {}
+
+        def add_score(node, amount):
+            if not isinstance(node, Tag) or node.name in ('[document]', 'html'):
+                return
+            if id(node) not in scores:
+                base = {'div': 5, 'article': 10, 'section': 3, 'main': 5,
+                        'pre': 3, 'td': 3, 'blockquote': 3}.get(node.name, 0)
+                if node.name in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'th', 'li', 'ol', 'ul', 'dl'):
+                    base = -5
+                scores[id(node)] = base + self._class_weight(node)
+                nodes[id(node)] = node
+            scores[id(node)] += amount
+
+        for paragraph in soup.find_all(PARAGRAPH_TAGS):
+            text = paragraph.get_text(' ', strip=True)
+            if len(text) < self.min_paragraph_length:
+                continue
+            score = 1 + text.count(',') + min(len(text) // 100, 3)
+            add_score(paragraph.parent, score)
+            if paragraph.parent is not None:
+                add_score(paragraph.parent.parent, score / 2)
+
+        if not scores:
+            return []
+
+        final = {key: score * (1 - self._link_density(nodes[key])) for key, score in scores.items()}
+        top_key = max(final, key=final.get)
+        top = nodes[top_key]
+
+        # Pull in siblings that look like more of the same article
+        threshold = max(10, final[top_key] * 0.2)
+        blocks = []
+        for sibling in (top.parent.find_all(recursive=False) if top.parent else [top]):
+            if sibling is top:
+                blocks.append(sibling)
+                continue
+            if final.get(id(sibling), 0) >= threshold:
+                blocks.append(sibling)
+            elif sibling.name == 'p':
+                text = sibling.get_text(' ', strip=True)
+                density = self._link_density(sibling)
+                if (len(text) > 80 and density < 0.25) or (0 < len(text) <= 80 and density == 0 and '. ' in text):
+                    blocks.append(sibling)
+        return blocks
+
+    def _blocks_to_text(self, blocks: List[Tag]) -> str:
+        """Paragraph-separated text of the chosen blocks"""
+        paragraphs = []
+        for block in blocks:
+            text_blocks = [block] if block.name in TEXT_BLOCK_TAGS else block.find_all(TEXT_BLOCK_TAGS)
+            seen = {id(text_block) for text_block in text_blocks}
+            block_paragraphs = []
+            for text_block in text_blocks:
+                # Nested text blocks (li > p) are covered by their ancestor
+                if text_block is not block and id(text_block.find_parent(TEXT_BLOCK_TAGS)) in seen:
+                    continue
+                text = re.sub(r'\s+', ' ', text_block.get_text(' ', strip=True))
+                if text:
+                    block_paragraphs.append(text)
+
+            # Text laid out with <br> in bare divs has no paragraph tags to follow
+            block_text = block.get_text('\n', strip=True)
+            if sum(len(p) for p in block_paragraphs) < len(block_text) / 2:
+                block_paragraphs = [re.sub(r'[ \t]+', ' ', line) for line in block_text.split('\n')]
+            paragraphs.extend(block_paragraphs)
+        return '\n\n'.join(paragraphs)
@@ -0,0 +1,40 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterator, Optional, Tuple
+from core.page_processor import process_page
+from utils.page_cache import PageCache
+
+logger = logging.getLogger(__name__)
+
+def replay_cached_pages(page_cache: PageCache, max_workers: Optional[int] = None) -> Iterator[Tuple[str, Dict]]:
+    """Re-run analysis and extraction over cached pages across CPU cores.
+
+    Yields (url, result) as pages finish, in completion order. At most a few
+    pages per worker are in flight, so large caches are never loaded at once.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_workers * 4
+    pending = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for page in page_cache.iter_latest_pages():
+            if len(pending) >= max_pending:
+                yield from _collect(pending)
+            future = executor.submit(process_page, page.url, page.html)
+            pending[future] = page.url
+
+        while pending:
+            yield from _collect(pending)
+
+def _collect(pending: Dict) -> Iterator[Tuple[str, Dict]]:
+    done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+    for future in done:
+        url = pending.pop(future)
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Error replaying {url}: {e}")
+            continue
+        if result:
+            yield url, result
@@ -1,20 +1,51 @@
 from selenium.webdriver.common.by import By
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString
+from bs4.element import Comment, Declaration, Doctype, ProcessingInstruction
+import math
 import re
-from typing import Dict, List, Optional
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qsl
 import logging
+from core.block_scorer import BlockScorer, FEATURE_NAMES
+from models.website import Website, UrlTemplate
+
+# Selectors worth carrying over to a compiled extractor
+EXTRACTOR_FIELDS = ('article', 'title', 'date')
+MIN_TEMPLATE_SAMPLES = 3
+MAX_TEMPLATE_SAMPLES = 10
+# Failures in a row before a learned extractor is dropped
+MAX_TEMPLATE_FAILURES = 3
+
+BLOCK_TAGS = ('article', 'div', 'section')
+POSITIVE_HINTS = ('content', 'article', 'post', 'entry', 'story', 'body', 'main')
+NEGATIVE_HINTS = ('comment', 'sidebar', 'footer', 'nav', 'menu', 'promo', 'related', 'share', 'widget', 'advert')
+SKIPPED_STRINGS = (Comment, Declaration, Doctype, ProcessingInstruction)
 
 class WebsiteAnalyzer:
-    def __init__(self, driver):
+    def __init__(self, driver, page_cache=None, scorer: Optional[BlockScorer] = None):
         self.driver = driver
+        self.page_cache = page_cache
+        self.scorer = scorer or BlockScorer.load()
         self.logger = logging.getLogger(__name__)
 
-    def analyze_website_structure(self, url: str) -> Dict:
+    def capture_page_source(self, url: str) -> str:
+        """Read the rendered page source and keep a copy in the page cache"""
+        page_source = self.driver.page_source
+        if self.page_cache:
+            try:
+                self.page_cache.store(url, page_source)
+            except OSError as e:
+                self.logger.warning(f"Could not cache {url}: {e}")
+        return page_source
+
+    def analyze_website_structure(self, url: str, page_source: Optional[str] = None) -> Dict:
         """Analyze website structure and detect content patterns"""
         self.logger.info(f"Analyzing website structure: {url}")
         
         # Get page source
-        page_source = self.driver.page_source
+        if page_source is None:
+            page_source = self.capture_page_source(url)
         soup = BeautifulSoup(page_source, 'html.parser')
         
         # Detect patterns
@@ -72,15 +103,15 @@ class WebsiteAnalyzer:
             'link_patterns': []
         }
 
-        # Find potential article containers
-        for tag in soup.find_all(['article', 'div', 'section']):
-            score = self._score_content_block(tag)
-            if score > 0.5:  # Threshold for likely content
-                patterns['article_candidates'].append({
-                    'selector': self._get_unique_selector(tag),
-                    'score': score,
-                    'features': self._extract_block_features(tag)
-                })
+        # Score every potential article container in one batch
+        tags, features = self.extract_block_features(soup)
+        scores = self.scorer.score(features)
+        for i in np.flatnonzero(scores > 0.5):  # Threshold for likely content
+            patterns['article_candidates'].append({
+                'selector': self._get_unique_selector(tags[i]),
+                'score': float(scores[i]),
+                'features': dict(zip(FEATURE_NAMES, features[i].tolist()))
+            })
 
         # Find potential titles
         for tag in soup.find_all(['h1', 'h2', 'h3']):
@@ -93,30 +124,6 @@ class WebsiteAnalyzer:
 
         return patterns
 
-    def _score_content_block(self, tag) -> float:
-        """Score a block based on how likely it is to be main content"""
-        score = 0.0
-        text = tag.get_text(strip=True)
-        
-        # Text length score
-        if len(text) > 1000:
-            score += 0.4
-        elif len(text) > 500:
-            score += 0.2
-
-        # Structure score
-        if tag.find_all(['p', 'img', 'ul', 'ol']):
-            score += 0.3
-
-        # Class/ID hints
-        hints = ['content', 'article', 'post', 'entry']
-        for attr in ['class', 'id']:
-            if tag.get(attr):
-                if any(hint in str(tag[attr]).lower() for hint in hints):
-                    score += 0.2
-
-        return min(score, 1.0)
-
     def _get_unique_selector(self, tag) -> str:
         """Generate a unique CSS selector for an element"""
         if tag.get('id'):
@@ -157,10 +164,133 @@ class WebsiteAnalyzer:
                 
         return verified
 
-    def learn_from_successful_scrape(self, url: str, successful_selectors: Dict):
-        """Learn from successful scraping patterns"""
-        # Implementation for pattern learning
-        pass
+    def learn_from_successful_scrape(self, website: Website, url: str, successful_selectors: Dict) -> Website:
+        """Learn a per-template extractor from successful scraping patterns"""
+        sample = {k: v for k, v in successful_selectors.items() if k in EXTRACTOR_FIELDS}
+        template = self.url_template(url)
+        entry = self._find_template(website, template)
+        if entry is None:
+            entry = UrlTemplate(template=template, samples=[], extractor=None)
+            website.templates[template] = entry
+
+        entry.samples = (entry.samples + [sample])[-MAX_TEMPLATE_SAMPLES:]
+        if len(entry.samples) >= MIN_TEMPLATE_SAMPLES:
+            entry.extractor = self._induce_extractor(entry.samples)
+
+        self._merge_sibling_templates(website)
+        return website
+
+    def match_template(self, website: Website, url: str) -> Optional[Dict[str, str]]:
+        """Return the learned extractor for a URL, if its template has one"""
+        entry = self._find_template(website, self.url_template(url))
+        if entry and entry.extractor:
+            return dict(entry.extractor)
+        return None
+
+    def record_template_result(self, website: Website, url: str, success: bool):
+        """Track a learned extractor, dropping it once it stops working"""
+        entry = self._find_template(website, self.url_template(url))
+        if not entry:
+            return
+        if success:
+            entry.hits += 1
+            entry.consecutive_failures = 0
+            return
+
+        entry.fail_count += 1
+        entry.consecutive_failures += 1
+        if entry.consecutive_failures >= MAX_TEMPLATE_FAILURES:
+            # Most likely a redesign: relearn from fresh samples
+            self.logger.info(f"Dropping extractor for {entry.template} after "
+                             f"{entry.consecutive_failures} failures in a row")
+            entry.extractor = None
+            entry.samples = []
+            entry.consecutive_failures = 0
+
+    def url_template(self, url: str) -> str:
+        """Generalize a URL path into a template such as /news/{yyyy}/{slug}"""
+        parsed = urlparse(url)
+        tokens = []
+        for segment in [s for s in parsed.path.lower().split('/') if s]:
+            previous = tokens[-1] if tokens else None
+            stem, dot, extension = segment.rpartition('.')
+            if not dot or not extension.isalpha() or len(extension) > 5:
+                stem, extension = segment, ''
+            token = self._classify_segment(stem, previous)
+            tokens.append(f"{token}.{extension}" if extension else token)
+
+        template = '/' + '/'.join(tokens)
+        query_keys = sorted(k for k, _ in parse_qsl(parsed.query))
+        if query_keys:
+            template += '?' + '&'.join(f"{k}={{value}}" for k in query_keys)
+        return template
+
+    def _classify_segment(self, segment: str, previous: Optional[str]) -> str:
+        if re.fullmatch(r'(19|20)\d{2}', segment):
+            return '{yyyy}'
+        if re.fullmatch(r'\d{1,2}', segment):
+            if previous == '{yyyy}':
+                return '{mm}'
+            if previous == '{mm}':
+                return '{dd}'
+        if re.fullmatch(r'\d+', segment):
+            return '{id}'
+        if re.fullmatch(r'[0-9a-f-]{16,}', segment) and re.search(r'\d', segment):
+            return '{id}'
+        if len(re.split(r'[-_]', segment)) >= 3 or len(segment) > 30:
+            return '{slug}'
+        return segment
+
+    def _find_template(self, website: Website, template: str) -> Optional[UrlTemplate]:
+        if template in website.templates:
+            return website.templates[template]
+        for known, entry in website.templates.items():
+            if self._template_matches(known, template):
+                return entry
+        return None
+
+    def _template_matches(self, known: str, template: str) -> bool:
+        known_parts = known.split('/')
+        parts = template.split('/')
+        if len(known_parts) != len(parts):
+            return False
+        return all(
+            k == p or (k == '{section}' and not p.startswith('{'))
+            for k, p in zip(known_parts, parts)
+        )
+
+    def _induce_extractor(self, samples: List[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """Keep only the selectors every sample agreed on"""
+        extractor = {
+            name: selector for name, selector in samples[0].items()
+            if all(sample.get(name) == selector for sample in samples[1:])
+        }
+        if 'article' not in extractor or 'title' not in extractor:
+            return None
+        return extractor
+
+    def _merge_sibling_templates(self, website: Website):
+        """Fold templates that differ in one literal segment into /{section}/"""
+        groups = {}
+        for template in website.templates:
+            parts = template.split('/')
+            for i, part in enumerate(parts):
+                if part and not part.startswith('{'):
+                    key = '/'.join(parts[:i] + ['{section}'] + parts[i + 1:])
+                    groups.setdefault(key, []).append(template)
+
+        for merged, members in groups.items():
+            if len(members) < MIN_TEMPLATE_SAMPLES or any(m not in website.templates for m in members):
+                continue
+            entries = [website.templates.pop(m) for m in members]
+            samples = [s for entry in entries for s in entry.samples][-MAX_TEMPLATE_SAMPLES:]
+            website.templates[merged] = UrlTemplate(
+                template=merged,
+                samples=samples,
+                extractor=self._induce_extractor(samples) if len(samples) >= MIN_TEMPLATE_SAMPLES else None,
+                hits=sum(entry.hits for entry in entries),
+                fail_count=sum(entry.fail_count for entry in entries)
+            )
 
     def _detect_navigation_patterns(self, soup: BeautifulSoup) -> Dict:
         """Detect navigation patterns in the page"""
@@ -219,15 +349,50 @@ class WebsiteAnalyzer:
                 
         return False
 
-    def _extract_block_features(self, tag) -> Dict:
-        """Extract features from a content block"""
-        return {
-            'text_length': len(tag.get_text(strip=True)),
-            'has_paragraphs': bool(tag.find_all('p')),
-            'has_images': bool(tag.find_all('img')),
-            'has_links': bool(tag.find_all('a')),
-            'depth': len(list(tag.parents))
-        }
+    def extract_block_features(self, soup: BeautifulSoup) -> Tuple[List, np.ndarray]:
+        """Build the feature matrix for every candidate block in one pass over the tree"""
+        # Walking descendants backwards visits children before their parents,
+        # so each node's totals are complete when they are pushed upwards
+        totals = {}
+        for node in reversed(list(soup.descendants)):
+            parent = node.parent
+            if parent is None:
+                continue
+            parent_totals = totals.setdefault(id(parent), [0, 0, 0, 0, 0])
+
+            if isinstance(node, NavigableString):
+                if not isinstance(node, SKIPPED_STRINGS) and parent.name not in ('script', 'style'):
+                    parent_totals[0] += len(node.strip())
+                continue
+
+            # [text, link text, paragraphs, images, lists]
+            node_totals = totals.setdefault(id(node), [0, 0, 0, 0, 0])
+            if node.name == 'a':
+                node_totals[1] = node_totals[0]
+            parent_totals[0] += node_totals[0]
+            parent_totals[1] += node_totals[1]
+            parent_totals[2] += node_totals[2] + (node.name == 'p')
+            parent_totals[3] += node_totals[3] + (node.name == 'img')
+            parent_totals[4] += node_totals[4] + (node.name in ('ul', 'ol'))
+
+        page_text = max(totals.get(id(soup), [0])[0], 1)
+        tags = soup.find_all(BLOCK_TAGS)
+        features = np.zeros((len(tags), len(FEATURE_NAMES)))
+        for i, tag in enumerate(tags):
+            text, link_text, paragraphs, images, lists = totals.get(id(tag), [0, 0, 0, 0, 0])
+            hints = ' '.join([tag.get('id') or ''] + (tag.get('class') or [])).lower()
+            features[i] = (
+                math.log1p(text),
+                math.log1p(paragraphs),
+                math.log1p(images),
+                math.log1p(lists),
+                link_text / text if text else 0.0,
+                any(hint in hints for hint in POSITIVE_HINTS),
+                any(hint in hints for hint in NEGATIVE_HINTS),
+                tag.name == 'article',
+                text / page_text
+            )
+        return tags, features
 
     def _extract_title_features(self, tag) -> Dict:
         """Extract features from a title element"""
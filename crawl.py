@@ -0,0 +1,80 @@
+"""Multi-process crawl: a durable queue sharded by domain, one worker per shard.
+
+Queue URLs (from a file, one per line, or discovered from a site's feeds and
+sitemaps), then run the workers. Results are merged into a new session in
+scraping_data.json, and learned patterns into website_patterns.json.
+
+    python crawl.py enqueue urls.txt --workers 4
+    python crawl.py discover https://example.com --workers 4
+    python crawl.py run [--fetch browser] [--incremental]
+    python crawl.py status
+"""
+import argparse
+import sys
+from core.coordinator import CrawlCoordinator, FETCH_MODES
+from core.crawl_queue import CrawlQueue
+from core.discovery import ArticleDiscovery
+
+def read_urls(path: str):
+    f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            if line.strip() and not line.startswith('#'):
+                yield line.strip()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded multi-process crawl")
+    parser.add_argument('--queue', default='crawl_queue.db')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help="Queue URLs from a file ('-' for stdin)")
+    enqueue.add_argument('file')
+    enqueue.add_argument('--workers', type=int, help="Shard count, fixed when the queue is created")
+
+    discover = commands.add_parser('discover', help="Queue article URLs from feeds and sitemaps")
+    discover.add_argument('sites', nargs='+')
+    discover.add_argument('--workers', type=int, help="Shard count, fixed when the queue is created")
+    discover.add_argument('--limit', type=int, default=1000, help="Maximum URLs per site")
+
+    run = commands.add_parser('run', help="Crawl the queue with one worker per shard")
+    run.add_argument('--fetch', choices=FETCH_MODES, default='http')
+    run.add_argument('--incremental', action='store_true', help="Skip pages that have not changed")
+    run.add_argument('--work-dir', default='crawl_shards')
+
+    commands.add_parser('status', help="Show queue progress per shard")
+    commands.add_parser('retry-failed', help="Requeue URLs that ran out of attempts")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        session_id = CrawlCoordinator(args.queue, args.work_dir, fetch_mode=args.fetch,
+                                      incremental=args.incremental).run()
+        print(f"Results saved to session {session_id}" if session_id else "No pages scraped")
+        return
+
+    try:
+        queue = CrawlQueue(args.queue, shards=getattr(args, 'workers', None))
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        if args.command == 'enqueue':
+            print(f"Queued {queue.enqueue(read_urls(args.file))} new URLs across {queue.shards} shards")
+        elif args.command == 'discover':
+            discovery = ArticleDiscovery()
+            for site in args.sites:
+                urls = (item.url for _, item in zip(range(args.limit), discovery.discover(site)))
+                print(f"{site}: queued {queue.enqueue(urls)} new URLs")
+        elif args.command == 'retry-failed':
+            print(f"Requeued {queue.retry_failed()} URLs")
+        else:
+            for shard, counts in sorted(queue.shard_counts().items()):
+                print(f"Shard {shard}: " + ', '.join(f"{status} {count}" for status, count in sorted(counts.items())))
+            print(f"Remaining: {queue.remaining()}")
+    finally:
+        queue.close()
+
+if __name__ == "__main__":
+    main()
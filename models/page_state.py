@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+from typing import Optional
+from datetime import datetime, timedelta
+
+@dataclass
+class PageState:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body_hash: Optional[str]
+    content_hash: Optional[str]
+    last_checked: datetime
+    next_check: datetime
+    interval: float
+    check_count: int = 0
+    change_count: int = 0
+
+    def is_due(self) -> bool:
+        return datetime.now() >= self.next_check
+
+    def reschedule(self, changed: bool, min_interval: float, max_interval: float):
+        """Shorten the re-check interval for pages that change, back off for stable ones"""
+        self.check_count += 1
+        if changed:
+            self.change_count += 1
+            self.interval = max(min_interval, self.interval / 2)
+        else:
+            self.interval = min(max_interval, self.interval * 2)
+        self.last_checked = datetime.now()
+        self.next_check = self.last_checked + timedelta(seconds=self.interval)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 from datetime import datetime
 
@@ -10,12 +10,22 @@ class WebsitePattern:
     success_count: int
     fail_count: int
 
+@dataclass
+class UrlTemplate:
+    template: str
+    samples: List[Dict[str, str]]
+    extractor: Optional[Dict[str, str]]
+    hits: int = 0
+    fail_count: int = 0
+    consecutive_failures: int = 0
+
 @dataclass
 class Website:
     url: str
     domain: str
     patterns: Dict[str, WebsitePattern]
     last_updated: datetime
+    templates: Dict[str, UrlTemplate] = field(default_factory=dict)
     
     def update_pattern_success(self, pattern_type: str, selector: str):
         if pattern_type in self.patterns:
@@ -1,20 +1,42 @@
-import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from fpdf import FPDF
 import time
 import json
 import os
+import queue
+import threading
 from datetime import datetime
 import urllib.request
 from core.website_analyzer import WebsiteAnalyzer
 from core.content_extractor import ContentExtractor
+from core.change_detector import ChangeDetector
+from core.replay import replay_cached_pages
+from core.page_processor import process_with_template, get_website, store_scrape_result, session_link
+from core.pipeline import ScrapePipeline
+from core.discovery import ArticleDiscovery
 from utils.storage import PatternStorage
+from utils.crawl_state import CrawlStateStorage
+from utils.page_cache import PageCache
+from utils.fetcher import fetch_url
+from utils.driver_manager import DriverManager, create_chrome
+from utils.exporter import StreamingExporter, EXPORT_FORMATS
+from utils.rate_limiter import RateLimiter, CircuitOpenError
 from models.website import Website, WebsitePattern
 from urllib.parse import urlparse
 import logging
-from typing import Dict, Optional
+from itertools import chain
+from typing import Dict, Iterator, List, Optional
+
+# Seconds between window handle checks in Manual Surf Mode. undetected_chromedriver
+# reads CDP events from the performance log about once a second, so events alone
+# would not find new tabs any sooner.
+NEW_TAB_SWEEP_INTERVAL = 1
+# Listing-page walk limits, so enumeration never eats the scraping time
+MAX_LISTING_PAGES = 5
+LISTING_BUDGET_SHARE = 0.25
 
 class SmartScraper:
     def __init__(self):
@@ -23,10 +45,19 @@ class SmartScraper:
         self.pdf_output_dir = 'scraped_articles'
         self.setup_directories()
         self.session_data = self.initialize_session_data()
-        self.driver = self.setup_driver()
-        self.analyzer = WebsiteAnalyzer(self.driver)
+        # Chrome starts on first use and is replaced before it leaks too much memory
+        self.driver = DriverManager(self.setup_driver, max_pages=200, max_rss_mb=2048)
+        self.page_cache = PageCache()
+        self.analyzer = WebsiteAnalyzer(self.driver, self.page_cache)
         self.extractor = ContentExtractor(self.driver)
         self.storage = PatternStorage()
+        # Only Manual Surf Mode listens to CDP events; they cost a log poll every second
+        self.cdp_events = False
+        # Guards website templates shared by pipeline dispatch and persistence
+        self.template_lock = threading.Lock()
+        self.rate_limiter = RateLimiter()
+        self.change_detector = ChangeDetector(CrawlStateStorage(), rate_limiter=self.rate_limiter)
+        self.incremental = False
         self.current_session = self.create_new_session()
 
     def setup_logging(self):
@@ -37,11 +68,13 @@ class SmartScraper:
         self.logger = logging.getLogger(__name__)
 
     def setup_driver(self):
-        options = uc.ChromeOptions()
-        options.headless = False
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        return uc.Chrome(options=options, version_main=133)
+        return create_chrome(cdp_events=self.cdp_events)
+
+    def use_cdp_events(self, enabled: bool):
+        """Choose whether the browser delivers CDP events, restarting it if that changes"""
+        if enabled != self.cdp_events and self.driver.started:
+            self.driver.quit()
+        self.cdp_events = enabled
 
     def setup_directories(self):
         if not os.path.exists(self.pdf_output_dir):
@@ -75,11 +108,13 @@ class SmartScraper:
                 print("3. Scrape Single URL")
                 print("4. Manage Links")
                 print("5. Export Options")
-                print("6. Exit")
+                print(f"6. Toggle Incremental Re-crawl (currently {'on' if self.incremental else 'off'})")
+                print("7. Replay Cached Pages")
+                print("8. Exit")
                 
-                mode = input("\nChoose mode (1-6): ").strip()
+                mode = input("\nChoose mode (1-8): ").strip()
                 
-                if mode == "6":
+                if mode == "8":
                     break
                     
                 if mode in ["1", "2", "3"]:
@@ -89,6 +124,7 @@ class SmartScraper:
                     
                     try:
                         print(f"\nNavigating to {url}")
+                        self.use_cdp_events(mode == "1")
                         self.driver.get(url)
                         time.sleep(3)  # Wait for page to load
                         
@@ -106,6 +142,11 @@ class SmartScraper:
                     self.manage_links_menu()
                 elif mode == "5":
                     self.export_menu()
+                elif mode == "6":
+                    self.incremental = not self.incremental
+                    print(f"Incremental re-crawl {'enabled' if self.incremental else 'disabled'}")
+                elif mode == "7":
+                    self.replay_cache_mode()
 
         except Exception as e:
             print(f"Error in main loop: {e}")
@@ -116,106 +157,320 @@ class SmartScraper:
         print("Instructions:")
         print("- Browser will open and you can click on articles")
         print("- Each clicked link will be saved automatically")
-        print("- Links will open in new tabs")
+        print("- Links can open in new tabs or the current one")
         print(f"- Session will last {duration} seconds")
         input("Press Enter to start...")
 
-        start_time = time.time()
+        # CDP listeners run on undetected_chromedriver's log reader thread and only
+        # signal the main loop; every driver call stays on this thread.
+        events = queue.Queue()
+        captured = queue.Queue()
         original_window = self.driver.current_window_handle
-        
-        while time.time() - start_time < duration:
-            try:
-                for handle in self.driver.window_handles:
-                    if handle != original_window:
-                        self.driver.switch_to.window(handle)
-                        url = self.driver.current_url
-                        content = self.scrape_content(url)
-                        
-                        if content:
-                            self.add_to_session(url, content)
-                            print(f"\nScraped: {content.get('title', 'No title')}")
-                        
-                        self.driver.close()
-                        self.driver.switch_to.window(original_window)
-                
+        known_windows = set(self.driver.window_handles)
+        seen = {self.driver.current_url}
+
+        def on_window_open(event):
+            events.put('window_open')
+
+        def on_navigation(event):
+            if not event['params']['frame'].get('parentId'):  # Main frame only
+                events.put('navigated')
+
+        def on_load(event):
+            events.put('loaded')
+
+        worker = threading.Thread(target=self._surf_worker, args=(captured,), daemon=True)
+        worker.start()
+
+        # ChromeDriver only forwards Page.*/Network.* events, so new tabs are
+        # announced by Page.windowOpen and found by diffing window handles.
+        self.driver.execute_cdp_cmd('Page.enable', {})
+        self.driver.add_cdp_listener('Page.windowOpen', on_window_open)
+        self.driver.add_cdp_listener('Page.frameNavigated', on_navigation)
+        self.driver.add_cdp_listener('Page.loadEventFired', on_load)
+
+        start_time = time.time()
+        next_sweep = start_time
+        navigated = False
+        try:
+            while time.time() - start_time < duration:
+                try:
+                    event = events.get(timeout=1)
+                except queue.Empty:
+                    event = None
+
+                if event == 'navigated':
+                    navigated = True
+                elif event == 'loaded' and navigated:
+                    navigated = False
+                    self._capture_current_tab(seen, captured)
+
+                # Tabs opened with a modifier key may not raise windowOpen, so sweep every second too
+                if event == 'window_open' or time.time() >= next_sweep:
+                    self._capture_new_tabs(original_window, known_windows, seen, captured)
+                    next_sweep = time.time() + NEW_TAB_SWEEP_INTERVAL
+
                 remaining = duration - (time.time() - start_time)
                 print(f"\rTime remaining: {int(remaining)} seconds", end='')
-                time.sleep(1)
-                
+        finally:
+            self.driver.clear_cdp_listeners()
+            captured.put(None)
+
+        pending = captured.qsize() - 1  # Minus the stop marker
+        if pending > 0:
+            print(f"\nFinishing {pending} captured pages...")
+        worker.join()
+
+    def _capture_current_tab(self, seen: set, captured: queue.Queue):
+        """Queue the page the user navigated to in the original tab"""
+        try:
+            url = self.driver.current_url
+            if url.startswith(('http://', 'https://')) and url not in seen:
+                seen.add(url)
+                print(f"\nCaptured: {url}")
+                captured.put((url, self.analyzer.capture_page_source(url)))
+        except Exception as e:
+            self.logger.warning(f"Could not read the current tab: {e}")
+
+    def _capture_new_tabs(self, original_window: str, known_windows: set, seen: set, captured: queue.Queue):
+        """Read the rendered HTML of newly opened tabs, then close them"""
+        try:
+            new_windows = [handle for handle in self.driver.window_handles if handle not in known_windows]
+        except Exception as e:
+            self.logger.warning(f"Could not list browser tabs: {e}")
+            return
+
+        for handle in new_windows:
+            try:
+                self.driver.switch_to.window(handle)
+                url = self.driver.current_url
+                ready = self.driver.execute_script('return document.readyState') == 'complete'
+                if not ready or not url.startswith(('http://', 'https://')):
+                    continue  # Still loading: look again on the next sweep
+
+                known_windows.add(handle)
+                page_source = None
+                try:
+                    page_source = self.analyzer.capture_page_source(url)
+                except Exception as e:
+                    # Fall back to fetching over the network in the worker
+                    self.logger.warning(f"Could not read rendered page {url}: {e}")
+                if url not in seen:
+                    seen.add(url)
+                    print(f"\nCaptured: {url}")
+                    captured.put((url, page_source))
+                self.driver.close()
+            except Exception as e:
+                known_windows.add(handle)
+                self.logger.warning(f"Could not capture tab: {e}")
+            finally:
+                try:
+                    self.driver.switch_to.window(original_window)
+                except Exception as e:
+                    self.logger.warning(f"Could not return to the original tab: {e}")
+
+    def _surf_worker(self, captured: queue.Queue):
+        """Scrape captured pages off the browser thread, so surfing never waits"""
+        while True:
+            item = captured.get()
+            if item is None:
+                break
+            url, page_source = item
+            try:
+                if self.incremental and not self.change_detector.should_scrape(url):
+                    continue
+
+                if page_source is None:
+                    # Explicit fallback only: loses JS-rendered content and the user's session
+                    response = self.rate_limiter.run(url, lambda: fetch_url(url))
+                    if response.status != 200:
+                        self.logger.warning(f"Got HTTP {response.status} for {url}")
+                        continue
+                    page_source = response.text()
+                    self.page_cache.store(url, page_source, response.headers)
+
+                content = self.scrape_page_source(url, page_source)
+                if content:
+                    self.add_to_session(url, content)
+                    print(f"\nScraped: {content.get('title', 'No title')}")
             except Exception as e:
-                print(f"\nError in manual surf: {e}")
-                continue
+                self.logger.error(f"Error scraping captured page {url}: {e}")
 
-    def auto_surf_mode(self, duration=120):
+    def auto_surf_mode(self, duration=120, links_per_page=5):
         """Auto surf mode that finds and scrapes content"""
         print(f"\nStarting auto surf mode for {duration} seconds...")
         start_time = time.time()
         
         try:
-            # Initial analysis of the page
-            analysis = self.analyzer.analyze_website_structure(self.driver.current_url)
-            if not analysis or 'selectors' not in analysis:
-                print("Could not detect article patterns on this page")
-                return
+            article_urls = self._discover_article_urls(self.driver.current_url)
+            if article_urls is None:
+                # No sitemap or feed: fall back to rendering listing pages
+                analysis = self.analyzer.analyze_website_structure(self.driver.current_url)
+                if not analysis or 'selectors' not in analysis:
+                    print("Could not detect article patterns on this page")
+                    return
 
-            selectors = analysis['selectors']
-            if 'link_selector' not in selectors:
-                print("Could not detect article links on this page")
-                return
+                selectors = analysis['selectors']
+                if 'link_selector' not in selectors:
+                    print("Could not detect article links on this page")
+                    return
 
-            while time.time() - start_time < duration:
-                try:
-                    # Find article links
-                    links = self.driver.find_elements(By.CSS_SELECTOR, selectors['link_selector'])
-                    print(f"\nFound {len(links)} potential article links")
-                    
-                    for link in links[:5]:  # Process top 5 links
-                        try:
-                            url = link.get_attribute('href')
-                            if url and url.startswith(('http://', 'https://')):
-                                print(f"\nAnalyzing: {url}")
-                                content = self.scrape_content(url)
-                                if content:
-                                    self.add_to_session(url, content)
-                                    print(f"Scraped: {content.get('title', 'No title')}")
-                                    print(f"Content length: {len(content.get('content', ''))}")
-                        except Exception as e:
-                            print(f"Error processing link: {e}")
-                            continue
-                    
-                    # Try to find and click next page if available
-                    if 'next_page' in analysis['navigation'] and analysis['navigation']['next_page']:
-                        try:
-                            next_button = self.driver.find_element(
-                                By.CSS_SELECTOR, analysis['navigation']['next_page']
-                            )
-                            next_button.click()
-                            time.sleep(3)
-                        except:
-                            print("\nNo more pages to process")
-                            break
-                    
-                    remaining = duration - (time.time() - start_time)
-                    print(f"\rTime remaining: {int(remaining)} seconds", end='')
-                    time.sleep(1)
-                    
-                except Exception as e:
-                    print(f"\nError during scraping: {e}")
-                    time.sleep(1)
+                article_urls = self._collect_article_links(
+                    analysis, links_per_page, start_time + duration * LISTING_BUDGET_SHARE
+                )
+                print(f"\nFound {len(article_urls)} potential article links")
+
+            def remaining_urls():
+                for url in article_urls:
+                    if time.time() - start_time >= duration:
+                        print("\nTime is up, stopping")
+                        return
+                    yield url
+
+            pipeline = ScrapePipeline(
+                fetch=self._fetch_rendered_page,
+                persist=self._persist_pipeline_result,
+                template_for=self._template_for
+            )
+            stats = pipeline.run(remaining_urls())
+
+            elapsed = time.time() - start_time
+            print("\nThroughput per stage:")
+            for stage in stats.values():
+                print(f"  {stage.summary(elapsed)}")
+            self.print_rate_limits()
                     
         except Exception as e:
             print(f"\nError in auto surf: {e}")
 
-    def add_to_session(self, url: str, content: dict):
-        """Add scraped content to current session"""
-        self.session_data["sessions"][self.current_session]["links"].append({
-            "url": url,
-            "title": content.get('title', ''),
-            "content": content.get('content', ''),
-            "date": content.get('date', ''),
-            "scraped_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
+    def _discover_article_urls(self, url: str) -> Optional[Iterator[str]]:
+        """Stream article URLs from the site's feeds and sitemaps, if it has any"""
+        discovered = ArticleDiscovery(rate_limiter=self.rate_limiter).discover(url)
+        first = next(discovered, None)
+        if first is None:
+            print("\nNo sitemaps or feeds found, falling back to listing pages")
+            return None
+        print("\nDiscovering articles from sitemaps and feeds...")
+
+        def article_urls():
+            for item in chain([first], discovered):
+                if self.incremental and not self.change_detector.changed_since_last_check(item.url, item.lastmod):
+                    continue
+                yield item.url
+
+        return article_urls()
+
+    def print_rate_limits(self):
+        """Show the current per-domain politeness limits"""
+        print("\nPer-domain limits:")
+        for domain, limits in self.rate_limiter.metrics().items():
+            print(f"  {domain}: {limits['rate']:.2f} req/s, concurrency {limits['concurrency']}, "
+                  f"circuit {limits['circuit']}, {limits['successes']} ok / "
+                  f"{limits['throttled']} throttled / {limits['failures']} failed / "
+                  f"{limits['client_errors']} 4xx / {limits['retries']} retries")
+
+    def _collect_article_links(self, analysis: Dict, links_per_page: int, deadline: float,
+                               max_pages: int = MAX_LISTING_PAGES) -> List[str]:
+        """Walk up to max_pages listing pages (until deadline) and gather article URLs"""
+        selectors = analysis['selectors']
+        article_urls = []
+
+        for _ in range(max_pages):
+            if time.time() >= deadline:
+                break
+            try:
+                links = self.driver.find_elements(By.CSS_SELECTOR, selectors['link_selector'])
+                found = 0
+                for link in links:
+                    url = link.get_attribute('href')
+                    if url and url.startswith(('http://', 'https://')) and url not in article_urls:
+                        article_urls.append(url)
+                        found += 1
+                        if found >= links_per_page:
+                            break
+            except Exception as e:
+                print(f"Error processing links: {e}")
+                found = 0
+
+            if not found:
+                break  # Paging further only finds links we already have
+
+            # Try to find and click next page if available
+            if not analysis['navigation'].get('next_page'):
+                break
+            try:
+                next_button = self.driver.find_element(
+                    By.CSS_SELECTOR, analysis['navigation']['next_page']
+                )
+                next_button.click()
+                time.sleep(3)
+            except:
+                print("\nNo more pages to process")
+                break
+
+        return article_urls
+
+    def _fetch_rendered_page(self, url: str) -> Optional[str]:
+        """Pipeline fetch stage: load a page in the browser and return its source"""
+        if self.incremental and not self.change_detector.should_scrape(url):
+            self.logger.info(f"Skipping unchanged page: {url}")
+            return None
+        print(f"\nAnalyzing: {url}")
+        try:
+            if not self._load_page(url):
+                return None
+        except CircuitOpenError as e:
+            self.logger.warning(f"Skipping {url}: {e}")
+            return None
+        self._wait_for_page(url)
+        return self.analyzer.capture_page_source(url)
+
+    def _load_page(self, url: str) -> bool:
+        """Open a URL in the browser under the rate limiter; False on an error status"""
+        page = self.rate_limiter.run(url, lambda: self.driver.load(url))
+        if page.status >= 400:
+            self.logger.warning(f"Got HTTP {page.status} for {url}")
+            return False
+        return True
+
+    def _template_for(self, url: str) -> Optional[Dict[str, str]]:
+        """Pipeline dispatch: the learned extractor for a URL.
+
+        Runs on the dispatch thread while persistence rewrites the templates.
+        """
+        with self.template_lock:
+            return self.analyzer.match_template(get_website(self.storage, url), url)
+
+    def _persist_pipeline_result(self, url: str, result: Optional[Dict], template_ok: Optional[bool]):
+        """Pipeline persistence stage: update patterns and the session"""
+        with self.template_lock:
+            content = self._store_scrape_result(get_website(self.storage, url), url, result, template_ok)
+        if content:
+            self.add_to_session(url, content)
+            print(f"Scraped: {content.get('title', 'No title')}")
+            print(f"Content length: {len(content.get('content', ''))}")
+
+    def replay_cache_mode(self):
+        """Re-run analysis and extraction over the page cache, offline"""
+        print("\nReplaying cached pages into a new session...")
+        self.current_session = self.create_new_session()
+        start_time = time.time()
+        count = 0
+
+        for url, result in replay_cached_pages(self.page_cache):
+            self.add_to_session(url, result['content'], save=False)
+            count += 1
+            print(f"\rExtracted {count} pages", end='')
+
         self.save_session_data()
+        print(f"\nReplayed {count} pages in {time.time() - start_time:.1f}s "
+              f"into session {self.current_session}")
+
+    def add_to_session(self, url: str, content: dict, save: bool = True):
+        """Add scraped content to current session"""
+        self.session_data["sessions"][self.current_session]["links"].append(session_link(url, content))
+        if save:
+            self.save_session_data()
 
     def manage_links_menu(self):
         """Submenu for managing links"""
@@ -244,9 +499,10 @@ class SmartScraper:
             print("1. Export All to Single PDF")
             print("2. Export Each Article to Separate PDFs")
             print("3. Export by Session")
-            print("4. Back to Main Menu")
+            print("4. Export Data (JSONL/CSV/Parquet)")
+            print("5. Back to Main Menu")
             
-            choice = input("\nChoose option (1-4): ").strip()
+            choice = input("\nChoose option (1-5): ").strip()
             
             if choice == "1":
                 self.export_to_pdf(single_file=True)
@@ -260,8 +516,33 @@ class SmartScraper:
                 else:
                     print("Invalid session ID")
             elif choice == "4":
+                self.export_data()
+            elif choice == "5":
                 break
 
+    def export_data(self):
+        """Stream sessions and links to JSONL, CSV or Parquet for analytics"""
+        fmt = input(f"Format ({'/'.join(EXPORT_FORMATS)}): ").strip().lower()
+        if fmt not in EXPORT_FORMATS:
+            print("Invalid format")
+            return
+
+        session_id = input("Session ID (Enter for all): ").strip() or None
+        if session_id and session_id not in self.session_data["sessions"]:
+            print("Invalid session ID")
+            return
+        domain = input("Domain (Enter for all): ").strip() or None
+        start_date = input("From date YYYY-MM-DD (Enter for any): ").strip() or None
+        end_date = input("To date YYYY-MM-DD (Enter for any): ").strip() or None
+
+        try:
+            path, count = StreamingExporter(self.session_data).export(
+                fmt, session_id=session_id, domain=domain, start_date=start_date, end_date=end_date
+            )
+            print(f"Exported {count} links to: {path}")
+        except Exception as e:
+            print(f"Error exporting data: {e}")
+
     def export_to_pdf(self, session_id=None, single_file=False):
         """Export articles to PDF"""
         if single_file:
@@ -377,36 +658,51 @@ class SmartScraper:
     def scrape_content(self, url: str) -> Optional[Dict]:
         """Scrape content from a URL"""
         try:
-            self.driver.get(url)
-            time.sleep(2)  # Wait for page load
-            
-            analysis = self.analyzer.analyze_website_structure(url)
-            if not analysis or 'selectors' not in analysis:
-                print("Could not detect content structure")
+            if self.incremental and not self.change_detector.should_scrape(url):
+                self.logger.info(f"Skipping unchanged page: {url}")
                 return None
-                
-            selectors = analysis['selectors']
-            if 'article' not in selectors or 'title' not in selectors:
-                print("Missing required selectors")
+
+            if not self._load_page(url):
                 return None
-                
-            content = self.extractor.extract_content(selectors)
-            if content:
-                # Update success patterns
-                website = self.storage.get_patterns(urlparse(url).netloc)
-                if website:
-                    for pattern_type in selectors:
-                        website.update_pattern_success(pattern_type, selectors[pattern_type])
-                    self.storage.update_patterns(website)
-                
-                return content
-            
+            self._wait_for_page(url)
+
+            page_source = self.analyzer.capture_page_source(url)
+            return self.scrape_page_source(url, page_source)
+        except CircuitOpenError as e:
+            self.logger.warning(f"Skipping {url}: {e}")
             return None
-            
         except Exception as e:
             self.logger.error(f"Error scraping {url}: {e}")
             return None
 
+    def _wait_for_page(self, url: str):
+        """Give the page time to render, waiting for the learned article element when known"""
+        time.sleep(2)  # Wait for page load
+        selectors = self._template_for(url)
+        if not selectors or not selectors.get('article'):
+            return
+        try:
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, selectors['article']))
+            )
+        except TimeoutException:
+            self.logger.warning(f"Article element did not appear on {url}")
+
+    def scrape_page_source(self, url: str, page_source: str) -> Optional[Dict]:
+        """Scrape content from already fetched HTML"""
+        website = get_website(self.storage, url)
+        selectors = self.analyzer.match_template(website, url)
+        result, template_ok = process_with_template(url, page_source, selectors)
+        return self._store_scrape_result(website, url, result, template_ok)
+
+    def _store_scrape_result(self, website: Website, url: str, result: Optional[Dict],
+                             template_ok: Optional[bool]) -> Optional[Dict]:
+        """Apply a processed page to the template, pattern and crawl state"""
+        if template_ok:
+            self.logger.info(f"Extracted with learned template: {url}")
+        return store_scrape_result(self.analyzer, self.storage, self.change_detector,
+                                   website, url, result, template_ok)
+
     def scrape_single_url(self, url: str):
         """Scrape content from a single URL"""
         if not url:
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from core.crawl_queue import CrawlQueue, shard_for
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = CrawlQueue(str(tmp_path / 'queue.db'), shards=2, lease_seconds=0.2, max_attempts=2)
+    yield queue
+    queue.close()
+
+def enqueue_one(queue, url='https://example.com/a'):
+    queue.enqueue([url])
+    return url, shard_for('example.com', queue.shards)
+
+def status_of(queue, url):
+    return queue.conn.execute("SELECT status, attempts, error FROM urls WHERE url = ?", (url,)).fetchone()
+
+def test_urls_of_a_domain_share_a_shard(queue):
+    assert queue.enqueue(['https://example.com/a', 'https://www.example.com/b', 'https://example.com/a']) == 2
+    shards = {shard for shard, in queue.conn.execute("SELECT shard FROM urls")}
+    assert shards == {shard_for('example.com', 2)}
+
+def test_shard_count_is_fixed_when_created(queue):
+    with pytest.raises(ValueError):
+        CrawlQueue(queue.db_path, shards=3)
+    assert CrawlQueue(queue.db_path).shards == 2
+
+def test_lease_claims_each_url_once(queue):
+    url, shard = enqueue_one(queue)
+    assert queue.lease(shard) == [url]
+    assert queue.lease(shard) == []
+    assert queue.lease(1 - shard) == []
+    assert status_of(queue, url)[:2] == ('leased', 1)
+    assert queue.remaining(shard) == 1
+
+def test_complete_removes_url_from_remaining(queue):
+    url, shard = enqueue_one(queue)
+    queue.lease(shard)
+    queue.complete(url)
+    assert status_of(queue, url)[0] == 'done'
+    assert queue.remaining() == 0
+
+def test_fail_retries_until_max_attempts(queue):
+    url, shard = enqueue_one(queue)
+    queue.lease(shard)
+    queue.fail(url, 'HTTP 500')
+    assert status_of(queue, url) == ('pending', 1, 'HTTP 500')
+
+    assert queue.lease(shard) == [url]
+    queue.fail(url, 'HTTP 500')
+    assert status_of(queue, url) == ('failed', 2, 'HTTP 500')
+    assert queue.lease(shard) == []
+
+def test_fail_without_retry_gives_up_at_once(queue):
+    url, shard = enqueue_one(queue)
+    queue.lease(shard)
+    queue.fail(url, 'HTTP 404', retry=False)
+    assert status_of(queue, url)[0] == 'failed'
+    assert queue.retry_failed() == 1
+    assert queue.lease(shard) == [url]
+
+def test_postpone_holds_url_without_using_an_attempt(queue):
+    url, shard = enqueue_one(queue)
+    queue.lease(shard)
+    queue.postpone(url, 0.2)
+    assert status_of(queue, url)[:2] == ('leased', 0)
+    assert queue.lease(shard) == []
+
+    time.sleep(0.25)
+    assert queue.lease(shard) == [url]
+    assert status_of(queue, url)[1] == 1
+
+def test_expired_lease_is_released_again(queue):
+    url, shard = enqueue_one(queue)
+    queue.lease(shard)
+    time.sleep(0.25)
+    assert queue.lease(shard) == [url]
+    assert status_of(queue, url)[:2] == ('leased', 2)
+
+def test_expired_lease_fails_after_max_attempts(queue):
+    url, shard = enqueue_one(queue)
+    for _ in range(2):
+        assert queue.lease(shard) == [url]
+        time.sleep(0.25)  # The worker died without completing the URL
+
+    assert queue.lease(shard) == []
+    assert status_of(queue, url) == ('failed', 2, 'Lease expired')
+    assert queue.remaining(shard) == 0
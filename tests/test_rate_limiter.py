@@ -0,0 +1,189 @@
+import threading
+import time
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.fetcher import fetch_url, open_url
+from utils.rate_limiter import RateLimiter, CircuitOpenError
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """/ok, /slow, /missing (404), /error (500), /unavailable (503) and
+    /throttle (429 with Retry-After: 1 on the first request, then 200)"""
+
+    def do_GET(self):
+        counts = self.server.counts
+        counts[self.path] = counts.get(self.path, 0) + 1
+        if self.path == '/slow':
+            time.sleep(0.3)
+        status, headers = {
+            '/missing': (404, {}),
+            '/error': (500, {}),
+            '/unavailable': (503, {}),
+            '/throttle': (429, {'Retry-After': '1'}) if counts[self.path] == 1 else (200, {})
+        }.get(self.path, (200, {}))
+
+        body = b'<html><body>ok</body></html>'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    httpd.counts = {}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def url_of(server, path):
+    return f"http://127.0.0.1:{server.server_port}{path}"
+
+def fetch(limiter, url):
+    return limiter.run(url, lambda: fetch_url(url, timeout=5))
+
+def domain_metrics(limiter, server):
+    return limiter.metrics()[f"127.0.0.1:{server.server_port}"]
+
+def test_fast_responses_increase_limits(server):
+    limiter = RateLimiter(initial_rate=1.0, initial_concurrency=2)
+    assert fetch(limiter, url_of(server, '/ok')).status == 200
+
+    limits = limiter.domains[f"127.0.0.1:{server.server_port}"]
+    assert limits.rate == pytest.approx(1.1)
+    assert limits.concurrency == pytest.approx(2.5)
+
+def test_throttling_halves_rate_and_concurrency(server):
+    limiter = RateLimiter(initial_rate=2.0, initial_concurrency=4, max_retries=0)
+    assert fetch(limiter, url_of(server, '/unavailable')).status == 503
+
+    metrics = domain_metrics(limiter, server)
+    assert metrics['rate'] == pytest.approx(1.0)
+    assert metrics['concurrency'] == 2
+    assert metrics['throttled'] == 1
+    assert metrics['failures'] == 0
+
+def test_server_error_counts_as_failure(server):
+    limiter = RateLimiter(initial_rate=2.0, max_retries=0)
+    assert fetch(limiter, url_of(server, '/error')).status == 500
+
+    metrics = domain_metrics(limiter, server)
+    assert metrics['rate'] == pytest.approx(1.0)
+    assert metrics['failures'] == 1
+
+def test_slow_responses_decrease_rate(server):
+    limiter = RateLimiter(initial_rate=1.0, target_latency=0.1)
+    assert fetch(limiter, url_of(server, '/slow')).status == 200
+
+    metrics = domain_metrics(limiter, server)
+    assert metrics['rate'] == pytest.approx(0.9)
+    assert metrics['latency'] >= 0.3
+
+def test_client_errors_leave_limits_alone(server):
+    limiter = RateLimiter(initial_rate=5.0, initial_concurrency=2)
+    for _ in range(3):
+        assert fetch(limiter, url_of(server, '/missing')).status == 404
+
+    metrics = domain_metrics(limiter, server)
+    assert metrics['rate'] == pytest.approx(5.0)
+    assert metrics['concurrency'] == 2
+    assert metrics['client_errors'] == 3
+    assert metrics['retries'] == 0
+
+def test_raised_client_error_is_not_retried(server):
+    limiter = RateLimiter(base_backoff=0.01)
+    with pytest.raises(urllib.error.HTTPError):
+        limiter.run(url_of(server, '/missing'), lambda: open_url(url_of(server, '/missing')))
+
+    assert server.counts['/missing'] == 1
+    assert domain_metrics(limiter, server)['client_errors'] == 1
+
+def test_non_retryable_errors_leave_limits_alone(server):
+    limiter = RateLimiter(initial_rate=5.0, initial_concurrency=2, base_backoff=0.01, failure_threshold=1)
+    calls = []
+
+    def broken():
+        calls.append(fetch_url(url_of(server, '/ok'), timeout=5))
+        raise ValueError("unparseable page")
+
+    with pytest.raises(ValueError):
+        limiter.run(url_of(server, '/ok'), broken)
+
+    assert len(calls) == 1
+    metrics = domain_metrics(limiter, server)
+    assert metrics['rate'] == pytest.approx(5.0)
+    assert metrics['concurrency'] == 2
+    assert metrics['in_flight'] == 0
+    assert metrics['failures'] == 0
+    assert metrics['circuit'] == 'closed'
+
+def test_retry_after_is_honoured(server):
+    limiter = RateLimiter(initial_rate=10.0, base_backoff=0.01, max_retries=2)
+    start = time.monotonic()
+    response = fetch(limiter, url_of(server, '/throttle'))
+
+    assert response.status == 200
+    assert time.monotonic() - start >= 1.0
+    assert server.counts['/throttle'] == 2
+    metrics = domain_metrics(limiter, server)
+    assert metrics['throttled'] == 1
+    assert metrics['retries'] == 1
+
+def test_retries_stop_after_max_retries(server):
+    limiter = RateLimiter(initial_rate=10.0, base_backoff=0.01, max_retries=2, failure_threshold=10)
+    assert fetch(limiter, url_of(server, '/error')).status == 500
+
+    assert server.counts['/error'] == 3
+    assert domain_metrics(limiter, server)['retries'] == 2
+
+def test_backoff_delay_is_jittered_and_capped():
+    limiter = RateLimiter(base_backoff=1.0, max_backoff=5.0)
+    for attempt in range(6):
+        delays = [limiter.backoff_delay(attempt) for _ in range(200)]
+        assert all(0 <= delay <= min(5.0, 2 ** attempt) for delay in delays)
+        assert len(set(delays)) > 1
+
+    assert all(limiter.backoff_delay(0, retry_after=3) >= 3 for _ in range(50))
+    assert limiter.backoff_delay(0, retry_after=120) == 5.0
+
+def test_circuit_breaker_opens_probes_and_closes(server):
+    limiter = RateLimiter(initial_rate=10.0, max_retries=0, failure_threshold=2, cooldown=0.3)
+    for _ in range(2):
+        fetch(limiter, url_of(server, '/error'))
+    assert domain_metrics(limiter, server)['circuit'] == 'open'
+    with pytest.raises(CircuitOpenError):
+        fetch(limiter, url_of(server, '/ok'))
+    assert '/ok' not in server.counts
+
+    # Failed half-open probe: open again, for twice as long
+    time.sleep(0.35)
+    fetch(limiter, url_of(server, '/error'))
+    assert domain_metrics(limiter, server)['circuit'] == 'open'
+    time.sleep(0.35)
+    with pytest.raises(CircuitOpenError):
+        fetch(limiter, url_of(server, '/ok'))
+
+    # Successful probe closes the circuit
+    time.sleep(0.35)
+    assert fetch(limiter, url_of(server, '/ok')).status == 200
+    assert domain_metrics(limiter, server)['circuit'] == 'closed'
+    assert fetch(limiter, url_of(server, '/ok')).status == 200
+
+def test_connection_errors_are_retried_then_raised():
+    limiter = RateLimiter(initial_rate=10.0, base_backoff=0.01, max_retries=2, failure_threshold=10)
+    url = 'http://127.0.0.1:9/'  # Nothing listens on the discard port
+    with pytest.raises(urllib.error.URLError):
+        limiter.run(url, lambda: fetch_url(url, timeout=2))
+
+    metrics = limiter.metrics()['127.0.0.1:9']
+    assert metrics['failures'] == 3
+    assert metrics['retries'] == 2
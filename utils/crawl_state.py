@@ -0,0 +1,69 @@
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+import os
+from models.page_state import PageState
+
+class CrawlStateStorage:
+    def __init__(self, storage_file: str = 'crawl_state.json'):
+        self.storage_file = storage_file
+        # Incremental scraping updates states from the fetch and persist threads
+        self._lock = threading.RLock()
+        self.states = self._load_states()
+
+    def _load_states(self) -> Dict:
+        """Load saved page states from file"""
+        if os.path.exists(self.storage_file):
+            with open(self.storage_file, 'r') as f:
+                data = json.load(f)
+                return {
+                    url: PageState(
+                        url=url,
+                        etag=state['etag'],
+                        last_modified=state['last_modified'],
+                        body_hash=state['body_hash'],
+                        content_hash=state['content_hash'],
+                        last_checked=datetime.fromisoformat(state['last_checked']),
+                        next_check=datetime.fromisoformat(state['next_check']),
+                        interval=state['interval'],
+                        check_count=state.get('check_count', 0),
+                        change_count=state.get('change_count', 0)
+                    )
+                    for url, state in data.items()
+                }
+        return {}
+
+    def save_states(self):
+        """Save page states to file"""
+        with self._lock:
+            data = {
+                url: {
+                    'etag': state.etag,
+                    'last_modified': state.last_modified,
+                    'body_hash': state.body_hash,
+                    'content_hash': state.content_hash,
+                    'last_checked': state.last_checked.isoformat(),
+                    'next_check': state.next_check.isoformat(),
+                    'interval': state.interval,
+                    'check_count': state.check_count,
+                    'change_count': state.change_count
+                }
+                for url, state in self.states.items()
+            }
+
+            # Write next to the target and rename, so a crash never leaves a partial file
+            tmp_path = f"{self.storage_file}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp_path, self.storage_file)
+
+    def get_state(self, url: str) -> Optional[PageState]:
+        """Get the stored state for a URL"""
+        return self.states.get(url)
+
+    def update_state(self, state: PageState):
+        """Update the stored state for a URL"""
+        with self._lock:
+            self.states[state.url] = state
+            self.save_states()
@@ -0,0 +1,139 @@
+import logging
+from dataclasses import dataclass
+from typing import Callable, Optional
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+from urllib3.exceptions import MaxRetryError
+
+try:
+    import psutil
+except ImportError:  # Listed in requirements; without it drivers are only recycled by page count
+    psutil = None
+
+CRASH_MESSAGES = ('chrome not reachable', 'disconnected', 'session deleted', 'no such session', 'tab crashed')
+# HTTP status of the main document (Navigation Timing Level 2, Chrome 109+); 0 when unknown
+RESPONSE_STATUS_SCRIPT = ("const entry = performance.getEntriesByType('navigation')[0];"
+                          "return entry ? entry.responseStatus || 0 : 0;")
+
+def create_chrome(headless: bool = False, cdp_events: bool = False):
+    """Start undetected Chrome with the options every part of the scraper uses"""
+    import undetected_chromedriver as uc
+    options = uc.ChromeOptions()
+    if headless:
+        options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    return uc.Chrome(options=options, version_main=133, enable_cdp_events=cdp_events)
+
+@dataclass
+class PageLoad:
+    url: str
+    status: int
+
+class DriverManager:
+    """Lazily started WebDriver that is recycled before it grows too large.
+
+    Attribute access is forwarded to the live driver, so the manager can be
+    passed anywhere a driver is expected. Chrome is only launched on first use.
+    """
+
+    def __init__(self, factory: Callable, max_pages: int = 200, max_rss_mb: Optional[float] = 2048):
+        self._factory = factory
+        self._driver = None
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.pages_loaded = 0
+        self.restarts = 0
+        self.logger = logging.getLogger(__name__)
+        if max_rss_mb and psutil is None:
+            self.logger.warning(f"psutil is not installed: the {max_rss_mb:.0f} MB memory limit is not "
+                                f"enforced, the browser is only recycled every {max_pages} pages")
+
+    @property
+    def started(self) -> bool:
+        return self._driver is not None
+
+    def get_driver(self):
+        if self._driver is None:
+            self.logger.info("Starting browser")
+            self._driver = self._factory()
+            self.pages_loaded = 0
+        return self._driver
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get_driver(), name)
+
+    def get(self, url: str):
+        """Navigate, recycling a worn-out driver first and restarting a crashed one"""
+        self._recycle_if_needed()
+        try:
+            self.get_driver().get(url)
+        except Exception as e:
+            if not self._is_crash(e):
+                raise
+            self.logger.warning(f"Browser crashed ({type(e).__name__}), restarting")
+            self.restarts += 1
+            self.quit()
+            self.get_driver().get(url)
+        self.pages_loaded += 1
+
+    def load(self, url: str) -> PageLoad:
+        """Navigate like get(), also reporting the main document's HTTP status.
+
+        The status lets the rate limiter see 429s and 5xx served to the browser.
+        A status the browser cannot report (cache, file://) counts as 200.
+        """
+        self.get(url)
+        try:
+            status = int(self.get_driver().execute_script(RESPONSE_STATUS_SCRIPT) or 0)
+        except Exception as e:
+            self.logger.warning(f"Could not read response status for {url}: {e}")
+            status = 0
+        return PageLoad(url=url, status=status or 200)
+
+    def memory_mb(self) -> Optional[float]:
+        """Resident memory of the browser and all its child processes"""
+        if psutil is None or self._driver is None:
+            return None
+        pid = getattr(self._driver, 'browser_pid', None)
+        if not pid:
+            return None
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except psutil.Error:
+            return None
+
+    def quit(self):
+        if self._driver is None:
+            return
+        try:
+            self._driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Error closing browser: {e}")
+        self._driver = None
+
+    def _recycle_if_needed(self):
+        if self._driver is None:
+            return
+        reason = None
+        if self.pages_loaded >= self.max_pages:
+            reason = f"{self.pages_loaded} pages loaded"
+        elif self.max_rss_mb:
+            memory = self.memory_mb()
+            if memory and memory > self.max_rss_mb:
+                reason = f"using {memory:.0f} MB"
+        if reason:
+            self.logger.info(f"Recycling browser: {reason}")
+            self.quit()
+
+    def _is_crash(self, error: Exception) -> bool:
+        # A dead chromedriver refuses connections instead of answering with an error
+        if isinstance(error, (InvalidSessionIdException, ConnectionError, MaxRetryError)):
+            return True
+        if isinstance(error, WebDriverException):
+            message = (error.msg or '').lower()
+            return any(crash in message for crash in CRASH_MESSAGES)
+        return False
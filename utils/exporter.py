@@ -0,0 +1,145 @@
+import csv
+import json
+import os
+import tempfile
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: only needed for Parquet export
+    pa = None
+
+EXPORT_FIELDS = ['session_id', 'session_date', 'url', 'domain', 'title', 'author',
+                 'date', 'scraped_date', 'content', 'metadata']
+EXPORT_FORMATS = ('jsonl', 'csv', 'parquet')
+
+class StreamingExporter:
+    """Write scraped links as flat rows (one per link, with its session) in bounded chunks"""
+
+    def __init__(self, session_data: Dict, output_dir: str = 'exports', chunk_size: int = 1000):
+        self.session_data = session_data
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size
+
+    def iter_rows(self, session_id: Optional[str] = None, domain: Optional[str] = None,
+                  start_date: Optional[str] = None, end_date: Optional[str] = None) -> Iterator[Dict]:
+        """Yield export rows, filtered by session, domain and scraped date (YYYY-MM-DD, inclusive)"""
+        domain = self._normalize_domain(domain) if domain else None
+        start_date = self._normalize_day(start_date)
+        end_date = self._normalize_day(end_date)
+        sessions = self.session_data.get("sessions", {})
+        session_ids = [session_id] if session_id else list(sessions.keys())
+
+        for sess_id in session_ids:
+            session = sessions.get(sess_id)
+            if not session:
+                continue
+            for link in session["links"]:
+                link_domain = self._normalize_domain(urlparse(link.get('url', '')).netloc)
+                if domain and link_domain != domain:
+                    continue
+                scraped_day = link.get('scraped_date', '')[:10]
+                if start_date and scraped_day < start_date:
+                    continue
+                if end_date and scraped_day > end_date:
+                    continue
+                yield {
+                    'session_id': sess_id,
+                    'session_date': session.get('date', ''),
+                    'url': link.get('url', ''),
+                    'domain': link_domain,
+                    'title': link.get('title', ''),
+                    'author': link.get('author', ''),
+                    'date': link.get('date', ''),
+                    'scraped_date': link.get('scraped_date', ''),
+                    'content': link.get('content', ''),
+                    'metadata': json.dumps(link.get('metadata', {}), ensure_ascii=False)
+                }
+
+    def export(self, fmt: str, **filters) -> Tuple[str, int]:
+        """Export matching rows to a new file, returning its path and row count"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if fmt == 'parquet' and pa is None:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        for name in ('start_date', 'end_date'):
+            self._normalize_day(filters.get(name))  # Fail before creating any file
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = f"links_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        filename = f"{stem}.{fmt}"
+        suffix = 1
+        while os.path.exists(os.path.join(self.output_dir, filename)):
+            filename = f"{stem}_{suffix}.{fmt}"
+            suffix += 1
+        path = os.path.join(self.output_dir, filename)
+        rows = self.iter_rows(**filters)
+
+        # Write next to the target and rename, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, prefix=f".{filename}.", suffix='.tmp')
+        os.close(fd)
+        try:
+            # mkstemp creates 0600 files; give the export the usual umask-based mode
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+            writer = {'jsonl': self._write_jsonl, 'csv': self._write_csv, 'parquet': self._write_parquet}[fmt]
+            count = writer(rows, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return path, count
+
+    def _chunks(self, rows: Iterator[Dict]) -> Iterator[List[Dict]]:
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _write_jsonl(self, rows: Iterator[Dict], path: str) -> int:
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for chunk in self._chunks(rows):
+                f.write(''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in chunk))
+                count += len(chunk)
+        return count
+
+    def _write_csv(self, rows: Iterator[Dict], path: str) -> int:
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            for chunk in self._chunks(rows):
+                writer.writerows(chunk)
+                count += len(chunk)
+        return count
+
+    def _write_parquet(self, rows: Iterator[Dict], path: str) -> int:
+        schema = pa.schema([(field, pa.string()) for field in EXPORT_FIELDS])
+        count = 0
+        # One row group per chunk keeps memory bounded on both write and read
+        with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+            for chunk in self._chunks(rows):
+                columns = {field: [row[field] for row in chunk] for field in EXPORT_FIELDS}
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                count += len(chunk)
+        return count
+
+    def _normalize_day(self, value: Optional[str]) -> Optional[str]:
+        """Validate a YYYY-MM-DD filter and zero-pad it, as dates are compared as strings"""
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            raise ValueError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+    def _normalize_domain(self, domain: str) -> str:
+        domain = domain.lower()
+        return domain[4:] if domain.startswith('www.') else domain
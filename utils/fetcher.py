@@ -0,0 +1,63 @@
+import gzip
+import io
+import urllib.request
+import urllib.error
+from dataclasses import dataclass
+from email.message import Message
+from typing import Dict, Optional
+
+DEFAULT_HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/133.0 Safari/537.36'),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Encoding': 'gzip'
+}
+
+@dataclass
+class FetchResponse:
+    url: str
+    status: int
+    headers: Message  # Case-insensitive lookups, as servers vary header case
+    body: bytes
+
+    def text(self) -> str:
+        charset = 'utf-8'
+        content_type = self.headers.get('Content-Type', '')
+        if 'charset=' in content_type:
+            charset = content_type.split('charset=')[-1].split(';')[0].strip()
+        return self.body.decode(charset, errors='replace')
+
+def fetch_url(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 15) -> FetchResponse:
+    """Fetch a URL without the browser, returning error statuses instead of raising"""
+    request = urllib.request.Request(url, headers={**DEFAULT_HEADERS, **(headers or {})})
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        # 304 and 4xx/5xx still carry headers the caller may need
+        response = e
+
+    with response:
+        status = response.status if hasattr(response, 'status') else response.code
+        response_headers = response.headers
+        body = response.read()
+
+    if response_headers.get('Content-Encoding', '').lower() == 'gzip' and body:
+        body = gzip.decompress(body)
+        del response_headers['Content-Encoding']
+
+    return FetchResponse(url=response.geturl() or url, status=status,
+                         headers=response_headers, body=body)
+
+def open_url(url: str, timeout: float = 15):
+    """Open a URL for streaming reads, transparently un-gzipping the body.
+
+    Handles both gzip transfer encoding and gzipped files such as sitemap.xml.gz.
+    """
+    request = urllib.request.Request(url, headers=DEFAULT_HEADERS)
+    response = urllib.request.urlopen(request, timeout=timeout)
+    stream = io.BufferedReader(response)
+    if response.headers.get('Content-Encoding', '').lower() == 'gzip':
+        stream = io.BufferedReader(gzip.GzipFile(fileobj=stream))
+    if stream.peek(2)[:2] == b'\x1f\x8b':
+        stream = io.BufferedReader(gzip.GzipFile(fileobj=stream))
+    return stream
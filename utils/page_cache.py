@@ -0,0 +1,139 @@
+import gzip
+import os
+import threading
+import uuid
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# The stored body is the decoded page re-encoded as UTF-8, so these no longer describe it
+BODY_HEADERS = ('transfer-encoding', 'content-encoding', 'content-length')
+
+@dataclass
+class CachedPage:
+    url: str
+    timestamp: datetime
+    headers: Dict[str, str]
+    html: str
+    record_id: str
+
+class PageCache:
+    """Append-only store of fetched pages as gzipped WARC response records"""
+
+    def __init__(self, cache_dir: str = 'page_cache'):
+        self.cache_dir = cache_dir
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._current_file = None
+
+    def store(self, url: str, html: str, headers: Optional[Dict[str, str]] = None) -> str:
+        """Append a page to the cache and return its record id"""
+        body = html.encode('utf-8')
+        http_block = (
+            'HTTP/1.1 200 OK\r\n'
+            + ''.join(f'{name}: {value}\r\n' for name, value in self._body_headers(headers, len(body)))
+            + '\r\n'
+        ).encode('utf-8') + body
+
+        record_id = f'<urn:uuid:{uuid.uuid4()}>'
+        warc_headers = (
+            'WARC/1.1\r\n'
+            'WARC-Type: response\r\n'
+            f'WARC-Record-ID: {record_id}\r\n'
+            f'WARC-Date: {datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}\r\n'
+            f'WARC-Target-URI: {url}\r\n'
+            'Content-Type: application/http; msgtype=response\r\n'
+            f'Content-Length: {len(http_block)}\r\n'
+            '\r\n'
+        ).encode('utf-8')
+
+        # One gzip member per record, so files stay readable by standard WARC tools
+        record = gzip.compress(warc_headers + http_block + b'\r\n\r\n')
+        with self._lock:
+            with open(self._get_current_file(), 'ab') as f:
+                f.write(record)
+        return record_id
+
+    def _body_headers(self, headers, length: int) -> List[Tuple[str, str]]:
+        """Origin headers rewritten to describe the stored UTF-8 body"""
+        result = []
+        content_type = 'text/html'
+        for name, value in (headers or {}).items():
+            if name.lower() == 'content-type':
+                content_type = value.split(';')[0].strip() or content_type
+            elif name.lower() not in BODY_HEADERS:
+                result.append((name, value))
+        result.append(('Content-Type', f'{content_type}; charset=utf-8'))
+        result.append(('Content-Length', str(length)))
+        return result
+
+    def iter_pages(self) -> Iterator[CachedPage]:
+        """Stream every cached record, oldest file first"""
+        if not os.path.exists(self.cache_dir):
+            return
+        for filename in sorted(os.listdir(self.cache_dir)):
+            if filename.endswith('.warc.gz'):
+                yield from self._read_file(os.path.join(self.cache_dir, filename))
+
+    def iter_latest_pages(self) -> Iterator[CachedPage]:
+        """Stream only the most recent capture of each URL"""
+        latest = {}
+        for page in self.iter_pages():
+            if page.url not in latest or page.timestamp >= latest[page.url][0]:
+                latest[page.url] = (page.timestamp, page.record_id)
+
+        wanted = {record_id for _, record_id in latest.values()}
+        for page in self.iter_pages():
+            if page.record_id in wanted:
+                yield page
+
+    def _get_current_file(self) -> str:
+        if self._current_file is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+            self._current_file = os.path.join(self.cache_dir, f'pages-{stamp}-{os.getpid()}.warc.gz')
+        return self._current_file
+
+    def _read_file(self, path: str) -> Iterator[CachedPage]:
+        """Parse WARC response records from a multi-member gzip file"""
+        try:
+            with gzip.open(path, 'rb') as f:
+                while True:
+                    line = f.readline()
+                    if not line:
+                        break
+                    if not line.startswith(b'WARC/'):
+                        continue
+
+                    warc_headers = self._read_headers(f)
+                    length = int(warc_headers.get('Content-Length', 0))
+                    block = f.read(length)
+                    if warc_headers.get('WARC-Type') != 'response':
+                        continue
+
+                    head, _, body = block.partition(b'\r\n\r\n')
+                    http_headers = {}
+                    for header_line in head.decode('utf-8', errors='replace').split('\r\n')[1:]:
+                        name, _, value = header_line.partition(':')
+                        http_headers[name.strip()] = value.strip()
+
+                    yield CachedPage(
+                        url=warc_headers['WARC-Target-URI'],
+                        timestamp=datetime.strptime(warc_headers['WARC-Date'], '%Y-%m-%dT%H:%M:%SZ'),
+                        headers=http_headers,
+                        html=body.decode('utf-8', errors='replace'),
+                        record_id=warc_headers['WARC-Record-ID']
+                    )
+        except (OSError, EOFError) as e:
+            # A crash mid-write leaves a truncated final member; keep what was readable
+            self.logger.warning(f"Stopped reading {path}: {e}")
+
+    def _read_headers(self, f) -> Dict[str, str]:
+        headers = {}
+        while True:
+            line = f.readline().decode('utf-8', errors='replace').strip()
+            if not line:
+                return headers
+            name, _, value = line.partition(':')
+            headers[name.strip()] = value.strip()
@@ -0,0 +1,249 @@
+import random
+import socket
+import threading
+import time
+import urllib.error
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+
+T = TypeVar('T')
+
+THROTTLE_STATUSES = (429, 503)
+
+class CircuitOpenError(Exception):
+    """Raised instead of contacting a domain whose circuit breaker is open"""
+
+@dataclass
+class DomainLimits:
+    rate: float
+    concurrency: float
+    tokens: float
+    last_refill: float
+    in_flight: int = 0
+    latency: Optional[float] = None
+    consecutive_failures: int = 0
+    circuit_open_until: float = 0.0
+    circuit_opened: int = 0
+    half_open: bool = False
+    requests: int = 0
+    successes: int = 0
+    throttled: int = 0
+    failures: int = 0
+    client_errors: int = 0
+    retries: int = 0
+
+class RateLimiter:
+    """Per-domain token bucket with AIMD concurrency, retries and a circuit breaker.
+
+    Fast, healthy responses raise a domain's request rate and concurrency
+    additively; 429/503, 5xx and timeouts cut both in half. Other 4xx leave
+    them alone. Repeated failures open the circuit and the domain is left
+    alone for a cooldown period.
+    """
+
+    def __init__(self, initial_rate: float = 1.0, min_rate: float = 0.1, max_rate: float = 10.0,
+                 initial_concurrency: int = 2, max_concurrency: int = 8,
+                 target_latency: float = 5.0, max_retries: int = 3,
+                 base_backoff: float = 1.0, max_backoff: float = 60.0,
+                 failure_threshold: int = 5, cooldown: float = 60.0):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.domains: Dict[str, DomainLimits] = {}
+        self.logger = logging.getLogger(__name__)
+        self._condition = threading.Condition()
+
+    def run(self, url: str, func: Callable[[], T]) -> T:
+        """Call func under the domain's limits, retrying throttled or failed attempts.
+
+        Results with a `status` attribute (e.g. FetchResponse) are judged by it;
+        anything else counts as a success unless it raises.
+        """
+        domain = urlparse(url).netloc.lower()
+        attempt = 0
+        while True:
+            self.acquire(domain)
+            start = time.monotonic()
+            try:
+                result = func()
+            except urllib.error.HTTPError as e:
+                # Raised by urlopen for error statuses: judge it like a response
+                self.release(domain, time.monotonic() - start, status=e.code)
+                if (e.code in THROTTLE_STATUSES or e.code >= 500) and attempt < self.max_retries:
+                    self._backoff(domain, attempt, self._retry_after(e))
+                    attempt += 1
+                    continue
+                raise
+            except Exception as e:
+                self.release(domain, time.monotonic() - start, error=e)
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                self._backoff(domain, attempt, None)
+                attempt += 1
+                continue
+
+            status = getattr(result, 'status', 200)
+            self.release(domain, time.monotonic() - start, status=status)
+            if (status in THROTTLE_STATUSES or status >= 500) and attempt < self.max_retries:
+                self._backoff(domain, attempt, self._retry_after(result))
+                attempt += 1
+                continue
+            return result
+
+    def acquire(self, domain: str):
+        """Block until the domain has both a free slot and a token"""
+        with self._condition:
+            limits = self._limits(domain)
+            while True:
+                now = time.monotonic()
+                if limits.circuit_open_until > now:
+                    raise CircuitOpenError(f"Circuit open for {domain} for another "
+                                           f"{limits.circuit_open_until - now:.0f}s")
+                if limits.circuit_opened and not limits.half_open and limits.consecutive_failures:
+                    # Cooldown over: let a single probe request through
+                    limits.half_open = True
+                    limits.concurrency = 1
+
+                self._refill(limits, now)
+                if limits.in_flight < max(1, int(limits.concurrency)) and limits.tokens >= 1:
+                    limits.tokens -= 1
+                    limits.in_flight += 1
+                    limits.requests += 1
+                    return
+
+                wait = (1 - limits.tokens) / limits.rate if limits.tokens < 1 else None
+                self._condition.wait(timeout=wait)
+
+    def release(self, domain: str, latency: float, status: Optional[int] = None,
+                error: Optional[Exception] = None):
+        """Report the outcome of a request and adapt the domain's limits"""
+        with self._condition:
+            limits = self._limits(domain)
+            limits.in_flight -= 1
+            if error is not None and not self._is_retryable(error):
+                # Not a network or browser failure (e.g. a parse error): the domain is not to blame
+                self._condition.notify_all()
+                return
+            limits.latency = latency if limits.latency is None else 0.8 * limits.latency + 0.2 * latency
+
+            if error is not None or (status is not None and status >= 500 and status not in THROTTLE_STATUSES):
+                limits.failures += 1
+                self._decrease(limits)
+                self._record_failure(domain, limits)
+            elif status in THROTTLE_STATUSES:
+                limits.throttled += 1
+                self._decrease(limits)
+            else:
+                # The server answered: the domain is healthy either way
+                limits.consecutive_failures = 0
+                if limits.half_open:
+                    self.logger.info(f"Circuit closed for {domain}")
+                    limits.half_open = False
+                    limits.circuit_opened = 0
+                if status is not None and status >= 400:
+                    # A 404 says nothing about load, so it moves no limit
+                    limits.client_errors += 1
+                else:
+                    limits.successes += 1
+                    if limits.latency <= self.target_latency:
+                        self._increase(limits)
+                    else:
+                        self._decrease(limits, factor=0.9)
+            self._condition.notify_all()
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Current limits and counters per domain"""
+        with self._condition:
+            now = time.monotonic()
+            return {
+                domain: {
+                    'rate': round(limits.rate, 3),
+                    'concurrency': int(limits.concurrency),
+                    'in_flight': limits.in_flight,
+                    'latency': round(limits.latency, 3) if limits.latency is not None else None,
+                    'circuit': ('open' if limits.circuit_open_until > now
+                                else 'half-open' if limits.half_open else 'closed'),
+                    'requests': limits.requests,
+                    'successes': limits.successes,
+                    'throttled': limits.throttled,
+                    'failures': limits.failures,
+                    'client_errors': limits.client_errors,
+                    'retries': limits.retries
+                }
+                for domain, limits in self.domains.items()
+            }
+
+    def _limits(self, domain: str) -> DomainLimits:
+        if domain not in self.domains:
+            self.domains[domain] = DomainLimits(
+                rate=self.initial_rate,
+                concurrency=self.initial_concurrency,
+                tokens=1.0,
+                last_refill=time.monotonic()
+            )
+        return self.domains[domain]
+
+    def _refill(self, limits: DomainLimits, now: float):
+        # Bucket depth follows concurrency, so bursts never exceed the slots
+        limits.tokens = min(max(1.0, limits.concurrency),
+                            limits.tokens + (now - limits.last_refill) * limits.rate)
+        limits.last_refill = now
+
+    def _increase(self, limits: DomainLimits):
+        limits.rate = min(self.max_rate, limits.rate + 0.1 * self.initial_rate)
+        limits.concurrency = min(self.max_concurrency, limits.concurrency + 1 / limits.concurrency)
+
+    def _decrease(self, limits: DomainLimits, factor: float = 0.5):
+        limits.rate = max(self.min_rate, limits.rate * factor)
+        limits.concurrency = max(1.0, limits.concurrency * factor)
+
+    def _record_failure(self, domain: str, limits: DomainLimits):
+        limits.consecutive_failures += 1
+        if limits.half_open or limits.consecutive_failures >= self.failure_threshold:
+            # Each re-open after a failed probe waits twice as long
+            limits.circuit_opened += 1
+            limits.half_open = False
+            cooldown = min(self.cooldown * 2 ** (limits.circuit_opened - 1), 3600)
+            limits.circuit_open_until = time.monotonic() + cooldown
+            self.logger.warning(f"Circuit opened for {domain} for {cooldown:.0f}s "
+                                f"after {limits.consecutive_failures} failures")
+
+    def _backoff(self, domain: str, attempt: int, retry_after: Optional[float]):
+        """Sleep with full jitter, honouring Retry-After when the server sends one"""
+        with self._condition:
+            self._limits(domain).retries += 1
+        delay = self.backoff_delay(attempt, retry_after)
+        self.logger.info(f"Retrying {domain} in {delay:.1f}s (attempt {attempt + 2})")
+        time.sleep(delay)
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential delay, never shorter than a (capped) Retry-After"""
+        delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_backoff))
+        return delay
+
+    def _retry_after(self, result) -> Optional[float]:
+        value = (getattr(result, 'headers', None) or {}).get('Retry-After')
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, CircuitOpenError):
+            return False
+        if isinstance(error, (socket.timeout, OSError)):
+            return True
+        # Selenium page-load timeouts and dropped connections
+        return type(error).__name__ in ('TimeoutException', 'WebDriverException', 'URLError')
@@ -2,7 +2,7 @@ import json
 from datetime import datetime
 from typing import Dict, Optional
 import os
-from models.website import Website, WebsitePattern
+from models.website import Website, WebsitePattern, UrlTemplate
 
 class PatternStorage:
     def __init__(self, storage_file: str = 'website_patterns.json'):
@@ -22,7 +22,10 @@ class PatternStorage:
                         patterns={
                             k: WebsitePattern(**v) for k, v in site_data['patterns'].items()
                         },
-                        last_updated=datetime.fromisoformat(site_data['last_updated'])
+                        last_updated=datetime.fromisoformat(site_data['last_updated']),
+                        templates={
+                            k: UrlTemplate(**v) for k, v in site_data.get('templates', {}).items()
+                        }
                     )
                     for domain, site_data in data.items()
                 }
@@ -43,7 +46,18 @@ class PatternStorage:
                     }
                     for k, v in website.patterns.items()
                 },
-                'last_updated': website.last_updated.isoformat()
+                'last_updated': website.last_updated.isoformat(),
+                'templates': {
+                    k: {
+                        'template': v.template,
+                        'samples': v.samples,
+                        'extractor': v.extractor,
+                        'hits': v.hits,
+                        'fail_count': v.fail_count,
+                        'consecutive_failures': v.consecutive_failures
+                    }
+                    for k, v in website.templates.items()
+                }
             }
             for domain, website in self.patterns.items()
         }